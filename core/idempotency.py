@@ -0,0 +1,102 @@
+from datetime import timedelta
+from functools import wraps
+import hashlib
+import json
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from user_auth_app.models import IdempotencyKey
+
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+
+# Response header marking a response that was replayed from the idempotency store.
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+MAX_KEY_LENGTH = 255
+
+
+# Returns a digest of the endpoint and request data, so a key reused for another request is detected.
+def get_request_fingerprint(request):
+    data = request.data
+    if hasattr(data, "lists"):
+        data = dict(data.lists())
+    payload = json.dumps([request.method, request.path, data], sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+# Deletes the stored responses older than IDEMPOTENCY_KEY_TTL, of one user or of everyone.
+# Returns the number of deleted keys.
+def purge_expired_keys(user=None):
+    keys = IdempotencyKey.objects.filter(
+        created_at__lt=timezone.now() - timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL))
+    if user is not None:
+        keys = keys.filter(user=user)
+    return keys.delete()[0]
+
+
+# Claims an idempotency key for a request in the database, so all workers see the same claim.
+# Returns the claimed row when the view should run, or a response to answer with right away:
+# the stored response of a finished request, 409 while the first request is still running,
+# or 422 when the key was used for a different request.
+def claim_key(request, key, fingerprint):
+    purge_expired_keys(request.user)
+    now = timezone.now()
+    try:
+        with transaction.atomic():
+            return IdempotencyKey.objects.create(user=request.user, key=key, fingerprint=fingerprint, created_at=now)
+    except IntegrityError:
+        record = IdempotencyKey.objects.filter(user=request.user, key=key).first()
+    if record is None:
+        return Response({"details": "Retry the request"}, status=status.HTTP_409_CONFLICT)
+    if record.status_code is None:
+        if record.created_at >= now - timedelta(seconds=settings.IDEMPOTENCY_LOCK_TIMEOUT):
+            return Response(
+                {"details": "A request with this Idempotency-Key is still being processed"},
+                status=status.HTTP_409_CONFLICT)
+        # The first request stopped without storing a response; the retry takes the key over.
+        taken = IdempotencyKey.objects.filter(pk=record.pk, created_at=record.created_at, status_code=None).update(
+            fingerprint=fingerprint, created_at=now)
+        if not taken:
+            return Response({"details": "Retry the request"}, status=status.HTTP_409_CONFLICT)
+        record.fingerprint, record.created_at = fingerprint, now
+        return record
+    if record.fingerprint != fingerprint:
+        return Response(
+            {"details": f"{IDEMPOTENCY_HEADER} was already used with a different request"},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+    return Response(json.loads(bytes(record.content)), status=record.status_code, headers={REPLAYED_HEADER: "true"})
+
+
+# Decorator for create actions honouring the Idempotency-Key header.
+# The first request with a key runs the view and stores its status and rendered body; retries with the
+# same key and payload get the stored response without running the view again, on any worker.
+# Server errors are not stored, so the client can retry them.
+def idempotent(view_method):
+    @wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if not key or not request.user.is_authenticated:
+            return view_method(self, request, *args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            return Response({"details": f"{IDEMPOTENCY_HEADER} is too long"}, status=status.HTTP_400_BAD_REQUEST)
+        claim = claim_key(request, key, get_request_fingerprint(request))
+        if isinstance(claim, Response):
+            return claim
+        claimed = IdempotencyKey.objects.filter(pk=claim.pk, created_at=claim.created_at)
+        try:
+            response = view_method(self, request, *args, **kwargs)
+        except Exception:
+            claimed.delete()
+            raise
+        if response.status_code < 500 and getattr(response, "data", None) is not None:
+            claimed.update(status_code=response.status_code, content=JSONRenderer().render(response.data))
+        else:
+            claimed.delete()
+        return response
+    return wrapper
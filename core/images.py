@@ -0,0 +1,132 @@
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import logging
+from io import BytesIO
+from threading import Lock
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from django.dispatch import Signal
+
+from core.links import get_link_builder
+
+
+logger = logging.getLogger(__name__)
+
+# Sent with the instance and content hash once the variants of an image are stored.
+image_processed = Signal()
+
+_executor = None
+_executor_lock = Lock()
+
+
+# Returns the shared background executor, creating it on first use.
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.IMAGE_PIPELINE_WORKERS, thread_name_prefix="image-pipeline")
+        return _executor
+
+
+# Returns the content-addressed storage path of a variant.
+def get_variant_path(digest, name):
+    return f"variants/{digest[:2]}/{digest}/{name}.webp"
+
+
+# Returns the absolute URLs of all variants of an image hash, or None if not processed yet.
+def get_variant_urls(digest, request=None):
+    if not digest:
+        return None
+    links = get_link_builder(request)
+    return {
+        name: links.absolute(default_storage.url(get_variant_path(digest, name)))
+        for name in settings.IMAGE_VARIANTS
+    }
+
+
+# Computes the SHA-256 hash of a stored file in chunks.
+def hash_file(field_file):
+    digest = hashlib.sha256()
+    with field_file.open("rb") as file:
+        for chunk in file.chunks():
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# Renders and stores every missing WebP variant of an image; identical uploads share them.
+def generate_variants(field_file, digest):
+    from PIL import Image, ImageOps
+
+    missing = {
+        name: size for name, size in settings.IMAGE_VARIANTS.items()
+        if not default_storage.exists(get_variant_path(digest, name))
+    }
+    if not missing:
+        return
+    with field_file.open("rb") as file:
+        image = Image.open(file)
+        image = ImageOps.exif_transpose(image).convert("RGB")
+    for name, size in missing.items():
+        output = BytesIO()
+        ImageOps.fit(image, size).save(output, format="WEBP", quality=80)
+        default_storage.save(get_variant_path(digest, name), ContentFile(output.getvalue()))
+
+
+# Hashes a stored image, generates its variants and records the hash on the instance.
+def process_image(model_label, pk, field_name, hash_field, digest=None):
+    model = apps.get_model(model_label)
+    try:
+        instance = model.objects.filter(pk=pk).first()
+        field_file = getattr(instance, field_name, None)
+        if not field_file:
+            return
+        digest = digest or hash_file(field_file)
+        if digest != getattr(instance, hash_field):
+            generate_variants(field_file, digest)
+            updated = model.objects.filter(pk=pk, **{field_name: field_file.name}).update(**{hash_field: digest})
+            if updated:
+                setattr(instance, hash_field, digest)
+                image_processed.send(sender=model, instance=instance, digest=digest)
+    except ImportError:
+        logger.warning("Pillow is not installed, skipping image variants of %s %s.", model_label, pk)
+    except Exception:
+        logger.exception("Could not process the image of %s %s.", model_label, pk)
+    finally:
+        close_old_connections()
+
+
+# Remembers the hash computed while a fresh upload was streamed in,
+# before saving the field replaces the uploaded file object.
+def remember_upload_digest(instance, field_name):
+    uploaded_file = getattr(getattr(instance, field_name), "_file", None)
+    digest = getattr(uploaded_file, "sha256", None)
+    if digest:
+        instance.__dict__.setdefault("_upload_digests", {})[field_name] = digest
+
+
+# Records the file name an instance was loaded with, so later saves can tell whether the file changed.
+# Deferred fields are recorded as empty and count as changed once saved with a file.
+def remember_stored_file(instance, field_name):
+    value = instance.__dict__.get(field_name)
+    instance.__dict__.setdefault("_stored_files", {})[field_name] = getattr(value, "name", value) or ""
+
+
+# Queues variant generation for an instance's image once the current transaction commits.
+# Runs for new instances and when the file name differs from the recorded one, not for other saves.
+def schedule_image_processing(instance, field_name, hash_field, created=True):
+    digest = instance.__dict__.get("_upload_digests", {}).pop(field_name, None)
+    name = getattr(instance, field_name).name or ""
+    stored_files = instance.__dict__.setdefault("_stored_files", {})
+    changed = created or stored_files.get(field_name) != name
+    stored_files[field_name] = name
+    if not name or not changed:
+        return
+    model_label = instance._meta.label
+    pk = instance.pk
+    transaction.on_commit(
+        lambda: get_executor().submit(process_image, model_label, pk, field_name, hash_field, digest))
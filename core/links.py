@@ -0,0 +1,82 @@
+from threading import Lock
+
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.urls import get_script_prefix, reverse
+
+
+# Stand-in primary key reversed into a route and split out again to get its template.
+ROUTE_PLACEHOLDER = 987654321
+
+_route_templates = {}
+_route_templates_lock = Lock()
+
+
+# Link pattern around a single primary key, formatted by plain concatenation.
+class LinkTemplate:
+
+    def __init__(self, prefix, suffix):
+        self.prefix = prefix
+        self.suffix = suffix
+
+    def format(self, pk):
+        return f"{self.prefix}{pk}{self.suffix}"
+
+    def format_many(self, pks):
+        prefix, suffix = self.prefix, self.suffix
+        return [f"{prefix}{pk}{suffix}" for pk in pks]
+
+
+# Returns the path template of a route taking one primary key, reversed once per process and script prefix.
+def get_route_template(name):
+    key = (name, get_script_prefix())
+    template = _route_templates.get(key)
+    if template is None:
+        prefix, suffix = reverse(name, args=[ROUTE_PLACEHOLDER]).split(str(ROUTE_PLACEHOLDER))
+        template = LinkTemplate(prefix, suffix)
+        with _route_templates_lock:
+            _route_templates[key] = template
+    return template
+
+
+# Forgets the reversed templates when the URLconf is swapped, e.g. by override_settings.
+@receiver(setting_changed)
+def clear_route_templates(setting, **kwargs):
+    if setting == "ROOT_URLCONF":
+        with _route_templates_lock:
+            _route_templates.clear()
+
+
+# Builds the links of one request: scheme and host are resolved once and shared by all rows.
+class LinkBuilder:
+
+    def __init__(self, request=None):
+        self.request = request
+        self.origin = request.build_absolute_uri("/")[:-1] if request is not None else ""
+
+    # Returns the absolute form of a URL, joining root-relative paths to the cached origin.
+    def absolute(self, url):
+        if self.request is None:
+            return url
+        if url.startswith("/") and not url.startswith("//"):
+            return self.origin + url
+        return self.request.build_absolute_uri(url)
+
+    # Returns the absolute URL of a route for one primary key.
+    def route(self, name, pk):
+        return self.origin + get_route_template(name).format(pk)
+
+    # Returns the absolute URLs of a route for many primary keys.
+    def routes(self, name, pks):
+        template = get_route_template(name)
+        return LinkTemplate(self.origin + template.prefix, template.suffix).format_many(pks)
+
+
+# Returns the link builder of a request, creating it on first use; requests without one get relative links.
+def get_link_builder(request=None):
+    if request is None:
+        return LinkBuilder()
+    builder = getattr(request, "_link_builder", None)
+    if builder is None:
+        builder = request._link_builder = LinkBuilder(request)
+    return builder
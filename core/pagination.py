@@ -0,0 +1,147 @@
+from base64 import b64decode, b64encode
+import json
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+# Keyset pagination on an allowed ordering field with the primary key as tiebreaker.
+# Subclasses list the fields a page may be keyed on and the default one.
+class KeysetPagination(BasePagination):
+    page_size = 5
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    pagination_query_param = "pagination"
+    keyset_fields = []
+    datetime_fields = []
+    default_keyset_field = None
+    invalid_cursor_message = "Invalid cursor"
+
+    # Checks whether the client asked for keyset pagination.
+    @classmethod
+    def is_requested(cls, request):
+        params = request.query_params
+        return cls.cursor_query_param in params or params.get(cls.pagination_query_param) == "cursor"
+
+    # Returns the requested page without counting or offsetting the queryset.
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.field, self.descending = self.get_keyset_ordering(queryset)
+        queryset = self.select_keyset_field(queryset)
+        position = self.decode_cursor(request)
+        is_reverse = position is not None and position["r"]
+
+        queryset = queryset.order_by(*self.get_order_by(is_reverse))
+        if position is not None:
+            queryset = queryset.filter(self.get_position_filter(position, is_reverse))
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+
+        if is_reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+        self.page = rows
+        return rows
+
+    # Returns the response in the same envelope as the page-number pagination.
+    def get_paginated_response(self, data):
+        return Response({
+            "count": None,
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        })
+
+    # Returns the page size from the query parameters, capped at max_page_size.
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+            if size > 0:
+                return min(size, self.max_page_size)
+        except (KeyError, ValueError):
+            pass
+        return self.page_size
+
+    # Determines the keyset field and direction from the queryset's ordering.
+    def get_keyset_ordering(self, queryset):
+        for ordering in queryset.query.order_by:
+            if not isinstance(ordering, str):
+                break
+            field = ordering.lstrip("-")
+            if field in self.keyset_fields:
+                return field, ordering.startswith("-")
+            break
+        return self.default_keyset_field, False
+
+    # Adds the keyset field to a values() projection that does not select it, so cursors can be encoded.
+    def select_keyset_field(self, queryset):
+        fields = queryset._fields
+        if fields and self.field not in fields:
+            return queryset.values(*fields, self.field)
+        return queryset
+
+    # Returns the ORDER BY clause for the keyset, reversed when paging backwards.
+    def get_order_by(self, is_reverse):
+        descending = self.descending != is_reverse
+        prefix = "-" if descending else ""
+        return [f"{prefix}{self.field}", f"{prefix}pk"]
+
+    # Builds the WHERE clause selecting rows after (or before) the cursor position.
+    def get_position_filter(self, position, is_reverse):
+        value = position["v"]
+        if self.field in self.datetime_fields:
+            value = parse_datetime(value)
+            if value is None:
+                raise NotFound(self.invalid_cursor_message)
+        lookup = "lt" if self.descending != is_reverse else "gt"
+        return Q(**{f"{self.field}__{lookup}": value}) | Q(
+            **{self.field: value, f"pk__{lookup}": position["pk"]})
+
+    # Decodes the cursor query parameter into a position dictionary.
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            position = json.loads(b64decode(encoded.encode("ascii")).decode("utf-8"))
+            if position["f"] != self.field or position["d"] != self.descending:
+                raise ValueError()
+            position["r"] = bool(position["r"])
+            return position
+        except (TypeError, ValueError, KeyError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    # Encodes a position relative to the given row into a page URL.
+    # Rows may be model instances or values() dictionaries.
+    def encode_cursor(self, row, is_reverse):
+        if isinstance(row, dict):
+            value, pk = row[self.field], row["pk"]
+        else:
+            value, pk = getattr(row, self.field), row.pk
+        if self.field in self.datetime_fields:
+            value = value.isoformat()
+        position = {"f": self.field, "d": self.descending, "v": value, "pk": pk, "r": int(is_reverse)}
+        encoded = b64encode(json.dumps(position, separators=(",", ":")).encode("utf-8")).decode("ascii")
+        url = remove_query_param(self.request.build_absolute_uri(), "page")
+        return replace_query_param(url, self.cursor_query_param, encoded)
+
+    # Returns the link to the following page or None on the last page.
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], is_reverse=False)
+
+    # Returns the link to the preceding page or None on the first page.
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], is_reverse=True)
@@ -0,0 +1,70 @@
+from operator import itemgetter
+
+from django.db.models.fields.files import FieldFile
+from rest_framework import serializers
+from rest_framework.settings import api_settings
+
+from core.links import get_link_builder
+
+
+# Field classes whose representation of a database value is the value itself.
+PASSTHROUGH_FIELDS = (
+    serializers.CharField,
+    serializers.IntegerField,
+    serializers.BooleanField,
+    serializers.PrimaryKeyRelatedField,
+)
+
+
+# Serializes values() rows into the exact output of a model serializer for list endpoints.
+# Accessors are compiled once from the serializer's fields; method fields are replaced by
+# get_<field> methods on the subclass that read the row dictionary.
+class ValuesSerializer:
+    serializer_class = None
+    # Additional value lookups read by the get_<field> methods.
+    values = []
+
+    def __init__(self, context=None):
+        self.context = context or {}
+        self.model = self.serializer_class.Meta.model
+        self.lookups = ["pk", *self.values]
+        self.accessors = [
+            (name, self.compile_accessor(name, field))
+            for name, field in self.serializer_class(context=self.context).fields.items()
+        ]
+
+    # Returns a function reading one field's representation from a row.
+    def compile_accessor(self, name, field):
+        method = getattr(self, f"get_{name}", None)
+        if method is not None:
+            return method
+        lookup = "__".join(field.source_attrs)
+        self.lookups.append(lookup)
+        if isinstance(field, PASSTHROUGH_FIELDS):
+            return itemgetter(lookup)
+        if isinstance(field, serializers.FileField):
+            return self.compile_file_accessor(field, lookup)
+        convert = field.to_representation
+        return lambda row: None if row[lookup] is None else convert(row[lookup])
+
+    # Returns an accessor rendering a stored file name as its URL, like the serializer's file field.
+    def compile_file_accessor(self, field, lookup):
+        model_field = self.model._meta.get_field(lookup)
+        if not getattr(field, "use_url", api_settings.UPLOADED_FILES_USE_URL):
+            convert = field.to_representation
+            return lambda row: convert(FieldFile(None, model_field, row[lookup]))
+        storage, links = model_field.storage, get_link_builder(self.context.get("request"))
+        return lambda row: links.absolute(storage.url(row[lookup])) if row[lookup] else None
+
+    # Restricts a queryset to the columns the accessors read, keeping extra selects used for ordering.
+    def project(self, queryset):
+        return queryset.values(*dict.fromkeys(self.lookups), *queryset.query.extra_select)
+
+    # Builds the output dictionaries of the given rows.
+    def to_representation(self, rows):
+        accessors = self.accessors
+        return [{name: accessor(row) for name, accessor in accessors} for row in rows]
+
+    # Projects and serializes a queryset in one go.
+    def serialize(self, queryset):
+        return self.to_representation(self.project(queryset))
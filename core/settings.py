@@ -105,6 +105,33 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'coderr-default',
+        'OPTIONS': {
+            'MAX_ENTRIES': 5000,
+        },
+    }
+}
+
+# Seconds a stored response is replayed for retries with the same Idempotency-Key;
+# older keys are purged by purge_idempotency_keys and on the next keyed request of their user.
+IDEMPOTENCY_KEY_TTL = 24 * 60 * 60
+
+# Seconds a request holds its Idempotency-Key before a retry may run the view again.
+IDEMPOTENCY_LOCK_TIMEOUT = 30
+
+# Seconds a cached offer list page is kept before it is rebuilt.
+OFFER_LIST_CACHE_TIMEOUT = 300
+
+# Seconds after which a worker reloads its offer title autocomplete index from the database in the background.
+SUGGEST_INDEX_TTL = 300
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -142,6 +169,24 @@ USE_TZ = True
 STATIC_URL = 'static/'
 STATICFILES_DIRS = [BASE_DIR / "static"]
 
+# Image variants generated in the background for uploaded offer and profile images.
+IMAGE_VARIANTS = {
+    'thumbnail': (200, 200),
+    'card': (640, 480),
+}
+
+IMAGE_PIPELINE_WORKERS = 2
+
+# Uploads are streamed to the media volume and hashed chunk by chunk.
+FILE_UPLOAD_HANDLERS = ['core.uploads.StreamingUploadHandler']
+
+UPLOAD_MAX_SIZE = 5 * 1024 * 1024
+
+UPLOAD_CONTENT_TYPES = ['image/jpeg', 'image/png', 'image/gif', 'image/webp']
+
+# Orders placed within this many days count towards the recent popularity of an offer.
+RECENT_ORDER_WINDOW_DAYS = 30
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
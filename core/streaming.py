@@ -0,0 +1,25 @@
+from itertools import islice
+
+from django.http import StreamingHttpResponse
+from rest_framework.renderers import JSONRenderer
+
+
+# Yields a queryset as the chunks of one JSON array, serializing chunk_size rows at a time.
+def iter_json_list(queryset, serializer_class, context=None, chunk_size=500):
+    renderer = JSONRenderer()
+    rows = queryset.iterator(chunk_size=chunk_size)
+    separator = b""
+    yield b"["
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+        yield separator + renderer.render(serializer_class(chunk, many=True, context=context).data)[1:-1]
+        separator = b","
+    yield b"]"
+
+
+# Streams a queryset as a JSON array whose memory use is bounded by the chunk size.
+def stream_json_list(queryset, serializer_class, context=None, chunk_size=500):
+    return StreamingHttpResponse(
+        iter_json_list(queryset, serializer_class, context, chunk_size), content_type="application/json")
@@ -0,0 +1,116 @@
+import hashlib
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler, StopFutureHandlers
+from django.http.multipartparser import MultiPartParserError
+
+
+# Leading bytes identifying the accepted upload types.
+IMAGE_SIGNATURES = {
+    "image/jpeg": [b"\xff\xd8\xff"],
+    "image/png": [b"\x89PNG\r\n\x1a\n"],
+    "image/gif": [b"GIF87a", b"GIF89a"],
+    "image/webp": [b"RIFF"],
+}
+
+
+# Raised while streaming an upload that exceeds the size limit or is not an accepted image.
+class UploadRejected(MultiPartParserError):
+    pass
+
+
+# Returns the directory next to the media storage that uploads are streamed into.
+def get_upload_dir():
+    location = getattr(default_storage, "location", None)
+    if location is None:
+        return settings.FILE_UPLOAD_TEMP_DIR
+    upload_dir = os.path.join(location, ".uploads")
+    os.makedirs(upload_dir, exist_ok=True)
+    return upload_dir
+
+
+# Detects the image type from the first bytes of an upload, or None if not accepted.
+def detect_image_type(header):
+    for content_type, signatures in IMAGE_SIGNATURES.items():
+        if any(header.startswith(signature) for signature in signatures):
+            if content_type != "image/webp" or header[8:12] == b"WEBP":
+                return content_type
+    return None
+
+
+# Uploaded file written to the storage volume, so saving it is a rename instead of a copy.
+class StreamedUploadedFile(UploadedFile):
+
+    def __init__(self, name, content_type, size, charset, content_type_extra=None):
+        _, ext = os.path.splitext(name)
+        file = tempfile.NamedTemporaryFile(suffix=".upload" + ext, dir=get_upload_dir())
+        super().__init__(file, name, content_type, size, charset, content_type_extra)
+        self.sha256 = None
+
+    def temporary_file_path(self):
+        return self.file.name
+
+    def close(self):
+        try:
+            return self.file.close()
+        except FileNotFoundError:
+            pass
+
+
+# Streams every uploaded file to disk while hashing it, enforcing size and type limits per chunk.
+class StreamingUploadHandler(FileUploadHandler):
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        if self.content_length is not None and self.content_length > settings.UPLOAD_MAX_SIZE:
+            raise UploadRejected(self.get_size_error())
+        self.file = StreamedUploadedFile(self.file_name, self.content_type, 0, self.charset, self.content_type_extra)
+        self.digest = hashlib.sha256()
+        self.header = b""
+        self.received = 0
+        raise StopFutureHandlers()
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > settings.UPLOAD_MAX_SIZE:
+            self.reject(self.get_size_error())
+        if self.header is not None:
+            self.check_header(raw_data)
+        self.digest.update(raw_data)
+        self.file.write(raw_data)
+
+    def file_complete(self, file_size):
+        if self.header is not None:
+            self.check_header(b"", complete=True)
+        self.file.seek(0)
+        self.file.size = file_size
+        self.file.sha256 = self.digest.hexdigest()
+        return self.file
+
+    def upload_interrupted(self):
+        if hasattr(self, "file"):
+            self.file.close()
+
+    # Collects the leading bytes and rejects the upload once they match no accepted type.
+    def check_header(self, raw_data, complete=False):
+        self.header += raw_data
+        if len(self.header) < 12 and not complete:
+            return
+        content_type = detect_image_type(self.header)
+        if content_type not in settings.UPLOAD_CONTENT_TYPES:
+            self.reject(f"Unsupported file type of {self.file_name}.")
+        self.file.content_type = content_type
+        self.header = None
+
+    # Removes the partially written file and aborts the request.
+    def reject(self, message):
+        self.file.close()
+        raise UploadRejected(message)
+
+    # Returns the error message for uploads larger than the limit.
+    def get_size_error(self):
+        return f"{self.file_name} exceeds the upload limit of {settings.UPLOAD_MAX_SIZE} bytes."
@@ -0,0 +1,30 @@
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+
+# Builds a strong ETag from the resource version parts and the negotiated format.
+def build_etag(request, *parts):
+    return quote_etag("-".join(str(part) for part in (*parts, request.accepted_renderer.format)))
+
+
+# Returns a timestamp as microseconds, to tell apart changes within the same second.
+def get_version(updated_at):
+    return int(updated_at.timestamp() * 1_000_000)
+
+
+# Returns a 304 response when the client's validators still match, otherwise None.
+def get_not_modified_response(request, etag, last_modified=None):
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+# Adds ETag, Last-Modified and a revalidation policy to a response.
+def set_validators(response, etag, last_modified=None):
+    response["ETag"] = etag
+    if last_modified:
+        response["Last-Modified"] = http_date(int(last_modified.timestamp()))
+    patch_cache_control(response, no_cache=True)
+    return response
@@ -0,0 +1,52 @@
+from django.db import connections
+from rest_framework import filters
+
+from offer_app.search import FTS_TABLE, build_match_query, has_search_index
+
+
+# Search backend using the SQLite FTS5 index and ranking matches with bm25.
+# Falls back to the LIKE based search on other database backends.
+class OfferSearchFilter(filters.SearchFilter):
+    rank_field = "search_rank"
+
+    def filter_queryset(self, request, queryset, view):
+        search_terms = self.get_search_terms(request)
+        if not search_terms or not has_search_index(queryset.db):
+            return super().filter_queryset(request, queryset, view)
+        match_query = build_match_query(search_terms)
+        if not match_query:
+            return queryset.none()
+        quote_name = connections[queryset.db].ops.quote_name
+        opts = queryset.model._meta
+        return queryset.extra(
+            select={self.rank_field: f"{quote_name(FTS_TABLE)}.rank"},
+            tables=[FTS_TABLE],
+            where=[
+                f"{quote_name(FTS_TABLE)} MATCH %s",
+                f"{quote_name(FTS_TABLE)}.rowid = {quote_name(opts.db_table)}.{quote_name(opts.pk.column)}",
+            ],
+            params=[match_query],
+        )
+
+
+# Ordering backend that orders search results by relevance unless an ordering is requested.
+# "popularity" and "trending" list the most ordered offers (all time / recent window) first.
+class OfferOrderingFilter(filters.OrderingFilter):
+    ordering_aliases = {
+        "popularity": "-order_count",
+        "trending": "-recent_order_count",
+    }
+
+    def get_ordering(self, request, queryset, view):
+        requested = request.query_params.get(self.ordering_param)
+        if not requested and OfferSearchFilter.rank_field in queryset.query.extra_select:
+            return [OfferSearchFilter.rank_field, *self.get_default_ordering(view)]
+        ordering = super().get_ordering(request, queryset, view)
+        return [self.resolve_alias(term) for term in ordering] if ordering else ordering
+
+    # Translates an ordering alias into its column, inverting the direction for "-alias".
+    def resolve_alias(self, term):
+        column = self.ordering_aliases.get(term.lstrip("-"))
+        if column is None:
+            return term
+        return column.lstrip("-") if term.startswith("-") else column
@@ -1,8 +1,31 @@
 from rest_framework.pagination import PageNumberPagination
 
+from core.pagination import KeysetPagination
+
+
+# Keyset pagination of offers on their sortable list columns.
+class OfferCursorPagination(KeysetPagination):
+    keyset_fields = ["updated_at", "min_price", "order_count", "recent_order_count"]
+    datetime_fields = ["updated_at"]
+    default_keyset_field = "updated_at"
+
 
 # Custom pagination for offers with page size and limits.
+# Switches to keyset pagination when a cursor or "pagination=cursor" is requested.
 class OfferPagination(PageNumberPagination):
     page_size = 5
     page_size_query_param = 'page_size'
     max_page_size = 100
+    cursor_pagination_class = OfferCursorPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_paginator = None
+        if self.cursor_pagination_class.is_requested(request):
+            self.cursor_paginator = self.cursor_pagination_class()
+            return self.cursor_paginator.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
@@ -2,12 +2,16 @@ from rest_framework.permissions import BasePermission
 
 
 # Allows access only to users with a profile of type 'business'.
+# Keeps the loaded profile on the request for the view.
 class IsBusinessPermission(BasePermission):
 
     def has_permission(self, request, view):
         try:
             profile = request.user.profiles.first()
-            return profile is not None and profile.type == "business"
+            if profile is None or profile.type != "business":
+                return False
+            request.profile = profile
+            return True
         except Exception:
             return False
         
@@ -1,8 +1,15 @@
 from rest_framework import serializers
 
-from offer_app.models import Offer, OfferDetail
+from core.images import get_variant_urls
+from core.links import LinkTemplate, get_link_builder
+from core.projections import ValuesSerializer
+
+from offer_app.models import Offer, OfferCard, OfferDetail
 from user_auth_app.models import Profile
 
+# Relative offer detail link emitted in offer lists.
+OFFER_DETAIL_LINK = LinkTemplate("/offerdetails/", "/")
+
 
 # Serializes user profile with first name, last name, and username.
 class UserDetailSerializer(serializers.ModelSerializer):
@@ -33,22 +40,27 @@ class OfferDetailSerializer(serializers.ModelSerializer):
         fields = ["id", "url"]
 
     def get_url(self, obj):
-        return f"/offerdetails/{obj.id}/"
+        return OFFER_DETAIL_LINK.format(obj.id)
 
 
 # Serializes offers with nested details and user information.
 class OfferSerializer(serializers.ModelSerializer):
     details = OfferDetailSerializer(many=True, read_only=True)
     user_details = UserDetailSerializer(source="user", read_only=True)
+    image_variants = serializers.SerializerMethodField()
 
     class Meta:
         model = Offer
         fields = [
-            "id", "user", "title", "image", "description",
+            "id", "user", "title", "image", "image_variants", "description",
             "created_at", "updated_at", "details",
             "min_price", "min_delivery_time", "user_details"
         ]
 
+    # Returns the URLs of the generated image variants, or None while processing.
+    def get_image_variants(self, obj):
+        return get_variant_urls(obj.image_hash, self.context.get("request"))
+
 
 # Serializes detailed offer info including feature titles.
 class OfferDetailResponseSerializer(serializers.ModelSerializer):
@@ -60,7 +72,11 @@ class OfferDetailResponseSerializer(serializers.ModelSerializer):
             "id", "title", "revisions", "delivery_time_in_days", "price", "features", "offer_type"
         ]
 
+    # Uses precomputed feature titles when present, otherwise the prefetched features.
     def get_features(self, obj):
+        feature_titles = getattr(obj, "feature_titles", None)
+        if feature_titles is not None:
+            return feature_titles
         return [f.title for f in obj.features.all()]
     
 
@@ -96,10 +112,7 @@ class OfferDetailListSerializer(serializers.ModelSerializer):
         fields = ("id", "url")
 
     def get_url(self, obj):
-        request = self.context.get("request")
-        if request:
-            return request.build_absolute_uri(f"/api/offerdetails/{obj.id}/")
-        return f"/api/offerdetails/{obj.id}/"
+        return get_link_builder(self.context.get("request")).route("offerdetail", obj.id)
 
 
 # Serializes updated offer with nested details.
@@ -124,4 +137,60 @@ class OfferRetrieveSerializer(serializers.ModelSerializer):
             "id", "user", "title", "image", "description",
             "created_at", "updated_at", "details",
             "min_price", "min_delivery_time"
-        ]
\ No newline at end of file
+        ]
+
+
+# Describes an autocomplete suggestion of an offer or feature title.
+class OfferSuggestionSerializer(serializers.Serializer):
+    type = serializers.ChoiceField(choices=["offer", "feature"])
+    id = serializers.IntegerField()
+    title = serializers.CharField()
+
+
+# Returns the id and link entries of the given offer details.
+def get_detail_links(detail_ids):
+    return [
+        {"id": detail_id, "url": url}
+        for detail_id, url in zip(detail_ids, OFFER_DETAIL_LINK.format_many(detail_ids))
+    ]
+
+
+# Serializes an offer card into the same shape as OfferSerializer.
+class OfferCardSerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField(source="offer_id", read_only=True)
+    user = serializers.IntegerField(source="user_id", read_only=True)
+    details = serializers.SerializerMethodField()
+    user_details = serializers.SerializerMethodField()
+    image_variants = serializers.SerializerMethodField()
+
+    class Meta:
+        model = OfferCard
+        fields = [
+            "id", "user", "title", "image", "image_variants", "description",
+            "created_at", "updated_at", "details",
+            "min_price", "min_delivery_time", "user_details"
+        ]
+
+    def get_details(self, obj):
+        return get_detail_links(obj.detail_ids)
+
+    def get_user_details(self, obj):
+        return {"first_name": obj.first_name, "last_name": obj.last_name, "username": obj.username}
+
+    def get_image_variants(self, obj):
+        return get_variant_urls(obj.image_hash, self.context.get("request"))
+
+
+# Fast list serialization of offer cards with the same output as OfferCardSerializer.
+class OfferCardValuesSerializer(ValuesSerializer):
+    serializer_class = OfferCardSerializer
+    values = ["detail_ids", "first_name", "last_name", "username", "image_hash"]
+
+    def get_details(self, row):
+        return get_detail_links(row["detail_ids"])
+
+    def get_user_details(self, row):
+        return {"first_name": row["first_name"], "last_name": row["last_name"], "username": row["username"]}
+
+    def get_image_variants(self, row):
+        return get_variant_urls(row["image_hash"], self.context.get("request"))
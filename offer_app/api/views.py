@@ -1,34 +1,50 @@
-from drf_spectacular.utils import OpenApiResponse, extend_schema
-from rest_framework import filters, status
+from django.db import transaction
+from django.db.models import prefetch_related_objects
+from django.utils import timezone
+from drf_spectacular.utils import OpenApiParameter, OpenApiResponse, extend_schema
+from rest_framework import status
+from rest_framework.decorators import action
 from rest_framework.exceptions import APIException, NotFound, PermissionDenied, ValidationError
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet, ReadOnlyModelViewSet
 
-from offer_app.models import Offer
-from offer_app.admin import Feature, OfferDetail
+from core.images import remember_upload_digest, schedule_image_processing
+from offer_app.cache import bump_offer_generation, get_cached_offer_list, get_offer_list_cache_key, set_cached_offer_list
+from offer_app.cards import build_offer_card, save_offer_cards
+from offer_app.models import Offer, OfferCard
+from offer_app.admin import OfferDetail
+from offer_app.features import resolve_feature_ids
+from offer_app.suggest import index_titles_on_commit, suggestion_index
+from offer_app.api.conditional import build_etag, get_not_modified_response, get_version, set_validators
+from offer_app.api.filters import OfferOrderingFilter, OfferSearchFilter
 from offer_app.api.pagination import OfferPagination
 from offer_app.api.permissions import IsBusinessPermission, IsOfferOwner
-from offer_app.api.serializers import OfferCreateSerializer, OfferDetailResponseSerializer, OfferResponseSerializer, OfferRetrieveSerializer, OfferSerializer, OfferUpdatedResponseSerializer
+from offer_app.api.serializers import OfferCardSerializer, OfferCardValuesSerializer, OfferCreateSerializer, OfferDetailResponseSerializer, OfferResponseSerializer, OfferRetrieveSerializer, OfferSerializer, OfferSuggestionSerializer, OfferUpdatedResponseSerializer
+from user_auth_app.models import Profile
 
 
 # ViewSet for handling all Offer CRUD operations and filtering.
 class OfferViewSet(ModelViewSet):
     queryset = Offer.objects.all().select_related(
-        "user").prefetch_related("details")
+        "user__user").prefetch_related("details")
     pagination_class = OfferPagination
     permission_classes = [AllowAny]
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [OfferSearchFilter, OfferOrderingFilter]
     search_fields = ["title", "description"]
-    ordering_fields = ["updated_at", "min_price"]
+    ordering_fields = ["updated_at", "min_price", "popularity", "trending"]
     ordering = ["updated_at"]
+    default_near_radius = 25
+    max_near_radius = 500
+    suggest_limit = 10
+    max_suggest_limit = 50
 
     # Returns the serializer class based on the current action.
     def get_serializer_class(self):
         if self.action == "retrieve":
             return OfferRetrieveSerializer
         elif self.action == "list":
-            return OfferSerializer
+            return OfferCardSerializer
         elif self.action == "create":
             return OfferCreateSerializer
         return OfferResponseSerializer
@@ -39,7 +55,7 @@ class OfferViewSet(ModelViewSet):
             permission_classes = [IsAuthenticated, IsOfferOwner]
         elif self.action == "retrieve":
             permission_classes = [IsAuthenticated]
-        elif self.action == "list":
+        elif self.action in ["list", "suggest"]:
             permission_classes = [AllowAny]
         elif self.action == "create":
             permission_classes = [IsAuthenticated, IsBusinessPermission]
@@ -50,26 +66,75 @@ class OfferViewSet(ModelViewSet):
         return [permission() for permission in permission_classes]
 
     # Gets and filters the queryset based on query parameters for listing.
+    # Lists are served from the denormalized OfferCard table.
     def get_queryset(self):
-        queryset = super().get_queryset()
         params = self.request.query_params
-        if self.action in ["partial_update", "update", "retrieve", "destroy"]:
+        if self.action == "list":
+            return self.get_params_to_filter(params, OfferCard.objects.all())
+        queryset = super().get_queryset()
+        if self.action in ["partial_update", "update"]:
+            return queryset.prefetch_related("details__features")
+        if self.action in ["retrieve", "destroy"]:
             return queryset
         queryset = self.get_params_to_filter(params, queryset)
         return queryset
 
     @extend_schema(
         summary="List all offers",
-        description="Returns a paginated list of all offers. You can filter offers by creator, minimum price, maximum delivery time, or search in title/description.",
+        description="Returns a paginated list of all offers. You can filter offers by creator, minimum price, maximum delivery time, or search in title/description. Search results are ranked by relevance unless an ordering is given. Order by `popularity` or `trending` to list the most ordered offers of all time or of the last days first. Use `near=lat,lng` with an optional `radius` in km (default 25) to find offers of business users nearby. Pass `pagination=cursor` to page with stable cursors instead of page numbers.",
         tags=["Offer"],
         responses={
             200: OfferSerializer(many=True),
             400: OpenApiResponse(description="At least one valid request parameter must be passed."),
         }
     )
-    # Returns a paginated list of all offers.
+    # Returns a paginated list of all offers, served from the cache when possible.
+    # The ETag is derived from the catalog generation and the normalized query.
     def list(self, request, *args, **kwargs):
-        return super().list(request, *args, **kwargs)
+        cache_key = get_offer_list_cache_key(request)
+        etag = build_etag(request, cache_key.replace(":", "-"))
+        not_modified = get_not_modified_response(request, etag)
+        if not_modified is not None:
+            return not_modified
+        data = get_cached_offer_list(cache_key)
+        if data is not None:
+            return set_validators(Response(data, status=status.HTTP_200_OK), etag)
+        response = self.list_offer_cards()
+        set_cached_offer_list(cache_key, response.data)
+        return set_validators(response, etag)
+
+    @extend_schema(
+        summary="Suggest offer and feature titles",
+        description="Returns up to `limit` (default 10, max 50) offer and feature titles with a word starting with `q`. Titles starting with `q` come first, then the most ordered offers and most used features. Served from an in-memory index for autocomplete.",
+        tags=["Offer"],
+        parameters=[
+            OpenApiParameter(name="q", description="Prefix to complete", required=True, type=str),
+            OpenApiParameter(name="limit", description="Maximum number of suggestions", required=False, type=int),
+        ],
+        responses={
+            200: OfferSuggestionSerializer(many=True),
+            400: OpenApiResponse(description="limit must be an integer"),
+        }
+    )
+    @action(detail=False, methods=["get"], url_path="suggest")
+    # Returns matching titles from the per-process suggestion index without touching the offer tables.
+    def suggest(self, request):
+        try:
+            limit = int(request.query_params.get("limit", self.suggest_limit))
+        except ValueError:
+            return Response({"details": "limit must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+        limit = min(max(limit, 1), self.max_suggest_limit)
+        results = suggestion_index.search(request.query_params.get("q", ""), limit)
+        return Response(results, status=status.HTTP_200_OK)
+
+    # Serializes the requested page of offer cards from a values() projection.
+    def list_offer_cards(self):
+        serializer = OfferCardValuesSerializer(context=self.get_serializer_context())
+        queryset = serializer.project(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        if page is None:
+            return Response(serializer.to_representation(queryset))
+        return self.get_paginated_response(serializer.to_representation(page))
 
     @extend_schema(
         summary="Retrieve offer details",
@@ -81,8 +146,17 @@ class OfferViewSet(ModelViewSet):
         }
     )
     # Retrieves the details of a single offer by its ID.
+    # Answers 304 from the offer's updated_at alone when the client copy is current.
     def retrieve(self, request, *args, **kwargs):
-        return super().retrieve(request, *args, **kwargs)
+        updated_at = Offer.objects.filter(pk=kwargs["pk"]).values_list("updated_at", flat=True).first()
+        if updated_at is None:
+            return super().retrieve(request, *args, **kwargs)
+        etag = build_etag(request, "offer", kwargs["pk"], get_version(updated_at))
+        not_modified = get_not_modified_response(request, etag, updated_at)
+        if not_modified is not None:
+            return not_modified
+        response = super().retrieve(request, *args, **kwargs)
+        return set_validators(response, etag, updated_at)
 
     @extend_schema(
         summary="Create a new offer",
@@ -100,8 +174,11 @@ class OfferViewSet(ModelViewSet):
         data = request.data
         try:
             profile = self.is_valid_business_profile(request)
-            offer, details = self.create_offer(data, profile)
-            self.create_details_features(details, offer)
+            with transaction.atomic():
+                offer, details = self.create_offer(data, profile)
+                offer_details = self.create_details_features(details, offer)
+                save_offer_cards([build_offer_card(offer, offer_details)])
+            prefetch_related_objects([offer], "details__features")
             serializer = OfferResponseSerializer(offer)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         except PermissionDenied:
@@ -125,13 +202,13 @@ class OfferViewSet(ModelViewSet):
     def partial_update(self, request, *args, **kwargs):
         offer = self.get_object()
         data = request.data
-        details_data = data.pop("details", None)
+        details_data = data.get("details")
         try:
-            self.update_offer_fields(offer, data)
-            if details_data is not None:
-                self.update_offer_details(offer, details_data)
-            self.update_offer_min_values(offer)
-            offer.refresh_from_db()
+            with transaction.atomic():
+                changed_fields = self.update_offer_fields(offer, data)
+                if details_data is not None:
+                    self.update_offer_details(offer, details_data)
+                self.save_offer(offer, changed_fields)
             serializer = OfferUpdatedResponseSerializer(
                 offer, context={"request": request})
             return Response(serializer.data, status=status.HTTP_200_OK)
@@ -155,18 +232,60 @@ class OfferViewSet(ModelViewSet):
         self.perform_destroy(offer)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
-    # Updates the fields of an offer with provided data.
+    # Sets the provided offer fields in memory and returns the names of the changed ones.
     def update_offer_fields(self, offer, data):
-        for field, value in data.items():
+        changed_fields = []
+        for field in ["title", "image", "description"]:
+            value = data.get(field)
             if value is not None:
                 setattr(offer, field, value)
-        offer.save()
+                changed_fields.append(field)
+        return changed_fields
+
+    # Writes the changed offer columns and recomputes the minimums in one UPDATE,
+    # then mirrors the new state onto the in-memory offer and its card.
+    def save_offer(self, offer, changed_fields):
+        if "image" in changed_fields:
+            remember_upload_digest(offer, "image")
+        values = {
+            field: Offer._meta.get_field(field).pre_save(offer, add=False)
+            for field in changed_fields
+        }
+        if "title" in changed_fields:
+            index_titles_on_commit([("offer", offer.pk, offer.title)])
+        if "image" in changed_fields:
+            offer.image_hash = values["image_hash"] = ""
+            schedule_image_processing(offer, "image", "image_hash")
+        offer.updated_at = timezone.now()
+        Offer.objects.filter(pk=offer.pk).refresh_min_values(updated_at=offer.updated_at, **values)
+        details = offer.details.all()
+        if details:
+            offer.min_price = min(detail.price for detail in details)
+            offer.min_delivery_time = min(detail.delivery_time_in_days for detail in details)
+        save_offer_cards([build_offer_card(offer, details)])
+        bump_offer_generation()
 
-    # Updates the details for an offer with validation.
+    # Validates all detail updates, then writes the changed details and features in bulk.
     def update_offer_details(self, offer, details_data):
         for detail_update in details_data:
             self.validate_detail_update(detail_update)
-            self.update_single_detail(offer, detail_update)
+        details = {detail.offer_type: detail for detail in offer.details.all()}
+        changed_details, changed_fields, feature_updates = [], set(), {}
+        for detail_update in details_data:
+            detail_obj = details.get(detail_update.get("offer_type"))
+            if detail_obj is None:
+                raise NotFound()
+            fields = self.update_single_detail(detail_obj, detail_update)
+            if fields:
+                changed_details.append(detail_obj)
+                changed_fields.update(fields)
+            if detail_update.get("features") is not None:
+                feature_updates[detail_obj] = detail_update["features"]
+        if changed_details:
+            OfferDetail.objects.bulk_update(changed_details, sorted(changed_fields))
+        if feature_updates:
+            self.update_detail_features(feature_updates)
+        offer._prefetched_objects_cache["details"] = sorted(details.values(), key=lambda detail: detail.title)
 
     # Validates that all required fields are present in the detail update.
     def validate_detail_update(self, detail_update):
@@ -182,34 +301,29 @@ class OfferViewSet(ModelViewSet):
         if extra:
             raise ValidationError("Invalid request data")
 
-    # Updates a single offer detail object with new values.
-    def update_single_detail(self, offer, detail_update):
-        offer_type = detail_update.get("offer_type")
-        try:
-            detail_obj = offer.details.get(offer_type=offer_type)
-        except OfferDetail.DoesNotExist:
-            raise NotFound()
+    # Sets new values on a detail object in memory and returns the names of the changed fields.
+    def update_single_detail(self, detail_obj, detail_update):
+        changed_fields = []
         for field in ["title", "revisions", "delivery_time_in_days", "price", "offer_type"]:
-            if field in detail_update and detail_update[field] is not None:
-                setattr(detail_obj, field, detail_update[field])
-        detail_obj.save()
-        self.update_detail_features(detail_obj, detail_update.get("features"))
+            value = detail_update.get(field)
+            if value is not None and getattr(detail_obj, field) != value:
+                setattr(detail_obj, field, value)
+                changed_fields.append(field)
+        return changed_fields
 
-    # Updates the features for a detail object.
-    def update_detail_features(self, detail_obj, feature_titles):
-        if feature_titles is not None:
-            feature_objs = [Feature.objects.get_or_create(
-                title=title)[0] for title in feature_titles]
-            detail_obj.features.set(feature_objs)
-
-    # Recalculates min price and delivery time for the offer.
-    def update_offer_min_values(self, offer):
-        all_details = offer.details.all()
-        if all_details:
-            offer.min_price = min([d.price for d in all_details])
-            offer.min_delivery_time = min(
-                [d.delivery_time_in_days for d in all_details])
-            offer.save()
+    # Replaces the features of the given details with one DELETE and one bulk INSERT.
+    def update_detail_features(self, feature_updates):
+        feature_ids = resolve_feature_ids(
+            [title for titles in feature_updates.values() for title in titles])
+        through_model = OfferDetail.features.through
+        through_model.objects.filter(offerdetail_id__in=[detail.id for detail in feature_updates]).delete()
+        through_model.objects.bulk_create([
+            through_model(offerdetail_id=detail.id, feature_id=feature_ids[title])
+            for detail, titles in feature_updates.items()
+            for title in dict.fromkeys(titles)
+        ])
+        for detail, titles in feature_updates.items():
+            detail.feature_titles = sorted(dict.fromkeys(titles))
 
     # Filters queryset by URL parameters if present.
     def get_params_to_filter(self, params, queryset):
@@ -229,11 +343,30 @@ class OfferViewSet(ModelViewSet):
                 queryset = queryset.filter(min_delivery_time__lte=int(max_delivery_time))
             except ValueError:
                 raise ValidationError({"max_delivery_time": "Must be an integer"})
+        if params.get("near"):
+            latitude, longitude, radius = self.get_near_params(params)
+            queryset = queryset.filter(user__in=Profile.objects.near(latitude, longitude, radius).values("pk"))
         return queryset
 
+    # Parses the near=lat,lng and radius (km) parameters of the location filter.
+    def get_near_params(self, params):
+        try:
+            latitude, longitude = (float(value) for value in params["near"].split(","))
+        except ValueError:
+            raise ValidationError({"near": "Must be latitude,longitude"})
+        if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+            raise ValidationError({"near": "Coordinates are out of range"})
+        try:
+            radius = float(params.get("radius") or self.default_near_radius)
+        except ValueError:
+            raise ValidationError({"radius": "Must be a number"})
+        if not 0 < radius <= self.max_near_radius:
+            raise ValidationError({"radius": f"Must be between 0 and {self.max_near_radius} km"})
+        return latitude, longitude, radius
+
     # Checks if the user profile is a valid business type.
     def is_valid_business_profile(self, request):
-        profile = request.user.profiles.first()
+        profile = getattr(request, "profile", None) or request.user.profiles.first()
         if not profile or profile.type != "business":
             raise PermissionDenied()
         return profile
@@ -244,7 +377,7 @@ class OfferViewSet(ModelViewSet):
         if not isinstance(details, list) or len(details) != 3:
             raise ValidationError()
 
-        offer = Offer.objects.create(
+        offer = Offer(
             user=profile,
             title=data.get('title'),
             image=data.get('image'),
@@ -252,13 +385,17 @@ class OfferViewSet(ModelViewSet):
             min_price=min(d['price'] for d in details),
             min_delivery_time=min(d['delivery_time_in_days'] for d in details)
         )
+        # The card is written once the details exist.
+        offer._skip_card_sync = True
+        offer.save()
         return offer, details
 
-    # Creates offer details and links features to them.
+    # Creates offer details and links features to them with bulk inserts.
     def create_details_features(self, details, offer):
-        for detail in details:
-            features = detail.pop('features', [])
-            offer_detail = OfferDetail.objects.create(
+        feature_titles = [title for detail in details for title in detail.get('features', [])]
+        feature_ids = resolve_feature_ids(feature_titles)
+        offer_details = OfferDetail.objects.bulk_create([
+            OfferDetail(
                 offer=offer,
                 title=detail.get('title'),
                 revisions=detail.get('revisions'),
@@ -266,17 +403,20 @@ class OfferViewSet(ModelViewSet):
                 price=detail.get('price'),
                 offer_type=detail.get('offer_type'),
             )
-            feature_objs = []
-            for feature_title in features:
-                feature_obj, _ = Feature.objects.get_or_create(
-                    title=feature_title)
-                feature_objs.append(feature_obj)
-            offer_detail.features.set(feature_objs)
+            for detail in details
+        ])
+        through_model = OfferDetail.features.through
+        through_model.objects.bulk_create([
+            through_model(offerdetail_id=offer_detail.id, feature_id=feature_ids[title])
+            for offer_detail, detail in zip(offer_details, details)
+            for title in dict.fromkeys(detail.get('features', []))
+        ])
+        return offer_details
 
 
 # Read-only view for listing and retrieving offer details.
 class OfferDetailView(ReadOnlyModelViewSet):
-    queryset = OfferDetail.objects.all()
+    queryset = OfferDetail.objects.all().prefetch_related("features")
     serializer_class = OfferDetailResponseSerializer
     permission_classes = [IsAuthenticated]
 
@@ -302,5 +442,14 @@ class OfferDetailView(ReadOnlyModelViewSet):
         }
     )
     # Retrieves the details of a single offer detail by its ID.
+    # Detail writes bump the parent offer's updated_at, which versions the detail.
     def retrieve(self, request, *args, **kwargs):
-        return super().retrieve(request, *args, **kwargs)
+        updated_at = OfferDetail.objects.filter(pk=kwargs["pk"]).values_list("offer__updated_at", flat=True).first()
+        if updated_at is None:
+            return super().retrieve(request, *args, **kwargs)
+        etag = build_etag(request, "offerdetail", kwargs["pk"], get_version(updated_at))
+        not_modified = get_not_modified_response(request, etag, updated_at)
+        if not_modified is not None:
+            return not_modified
+        response = super().retrieve(request, *args, **kwargs)
+        return set_validators(response, etag, updated_at)
@@ -1,6 +1,13 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class OfferAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'offer_app'
+
+    # Connects the model signals and installs the full-text search index after migrations.
+    def ready(self):
+        from offer_app import signals  # noqa: F401
+        from offer_app.search import install_search_index
+        post_migrate.connect(install_search_index, sender=self)
@@ -0,0 +1,56 @@
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+
+from offer_app.models import OfferCatalog
+
+
+# Primary key of the row holding the catalog generation.
+OFFER_CATALOG_ID = 1
+
+# Query parameters that change the offer list response.
+OFFER_LIST_PARAMS = [
+    "creator_id", "min_price", "max_delivery_time", "search", "near", "radius",
+    "ordering", "page", "page_size", "pagination", "cursor",
+]
+
+
+# Returns the current catalog generation, creating its row when missing.
+def get_offer_generation():
+    generation = OfferCatalog.objects.filter(pk=OFFER_CATALOG_ID).values_list("generation", flat=True).first()
+    if generation is None:
+        generation = OfferCatalog.objects.get_or_create(pk=OFFER_CATALOG_ID)[0].generation
+    return generation
+
+
+# Moves the catalog to a new generation so every cached list page becomes unreachable for all workers.
+# The bump is part of the writing transaction: other workers see the new generation together with the
+# committed data, so no page of the old data is cached under the new generation.
+def bump_offer_generation():
+    if not OfferCatalog.objects.filter(pk=OFFER_CATALOG_ID).update(generation=F("generation") + 1):
+        OfferCatalog.objects.get_or_create(pk=OFFER_CATALOG_ID)
+
+
+# Builds the cache key of an offer list request from its normalized query parameters.
+def get_offer_list_cache_key(request):
+    params = []
+    for name in OFFER_LIST_PARAMS:
+        value = request.query_params.get(name, "").strip()
+        if value:
+            params.append((name, value))
+    raw = json.dumps([request.scheme, request.get_host(), params])
+    digest = hashlib.sha256(raw.encode("utf-8")).hexdigest()
+    return f"offers:list:{get_offer_generation()}:{digest}"
+
+
+# Returns the cached data of an offer list page or None.
+def get_cached_offer_list(cache_key):
+    return cache.get(cache_key)
+
+
+# Stores the data of an offer list page.
+def set_cached_offer_list(cache_key, data):
+    cache.set(cache_key, data, settings.OFFER_LIST_CACHE_TIMEOUT)
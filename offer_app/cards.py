@@ -0,0 +1,71 @@
+from django.db.models import OuterRef, Prefetch, Subquery
+
+from offer_app.models import Offer, OfferCard, OfferDetail
+
+
+# Columns rewritten when an existing card is upserted.
+# The order counters are only copied on insert; afterwards they are maintained with F() updates.
+CARD_UPDATE_FIELDS = [
+    "user", "title", "image", "image_hash", "description", "created_at", "updated_at",
+    "min_price", "min_delivery_time", "first_name", "last_name", "username", "detail_ids",
+]
+
+
+# Builds the card of an offer from the offer, its owner and the given details.
+def build_offer_card(offer, details):
+    user = offer.user.user
+    return OfferCard(
+        offer_id=offer.pk,
+        user_id=offer.user_id,
+        title=offer.title,
+        image=offer.image.name or "",
+        image_hash=offer.image_hash,
+        description=offer.description,
+        created_at=offer.created_at,
+        updated_at=offer.updated_at,
+        min_price=offer.min_price,
+        min_delivery_time=offer.min_delivery_time,
+        first_name=user.first_name,
+        last_name=user.last_name,
+        username=user.username,
+        detail_ids=[detail.id for detail in sorted(details, key=lambda detail: detail.title)],
+        order_count=offer.order_count,
+        recent_order_count=offer.recent_order_count,
+    )
+
+
+# Inserts or replaces the given cards in one statement.
+def save_offer_cards(cards):
+    if cards:
+        OfferCard.objects.bulk_create(
+            cards, update_conflicts=True, unique_fields=["offer"], update_fields=CARD_UPDATE_FIELDS)
+
+
+# Rebuilds the cards of the given offers (all offers when None) from the database.
+def sync_offer_cards(offer_ids=None, chunk_size=500):
+    offers = Offer.objects.select_related("user__user").prefetch_related(
+        Prefetch("details", queryset=OfferDetail.objects.only("id", "offer_id", "title")))
+    if offer_ids is not None:
+        offers = offers.filter(pk__in=offer_ids)
+    cards = []
+    for offer in offers.iterator(chunk_size=chunk_size):
+        cards.append(build_offer_card(offer, offer.details.all()))
+        if len(cards) >= chunk_size:
+            save_offer_cards(cards)
+            cards = []
+    save_offer_cards(cards)
+
+
+# Copies the owner's names onto the cards of all offers of the given user.
+def sync_owner_names(user):
+    OfferCard.objects.filter(user__user=user).update(
+        first_name=user.first_name, last_name=user.last_name, username=user.username)
+
+
+# Copies the minimum price and delivery time of all offers onto their cards in one UPDATE.
+def sync_card_min_values():
+    offers = Offer.objects.filter(pk=OuterRef("offer"))
+    return OfferCard.objects.update(
+        min_price=Subquery(offers.values("min_price")),
+        min_delivery_time=Subquery(offers.values("min_delivery_time")),
+    )
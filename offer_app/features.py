@@ -0,0 +1,105 @@
+from collections import OrderedDict
+from threading import Lock
+
+from django.db import transaction
+from django.db.models import F
+
+from offer_app.cache import OFFER_CATALOG_ID
+from offer_app.models import Feature, OfferCatalog
+from offer_app.suggest import index_titles_on_commit
+
+
+# Bounded least-recently-used cache mapping feature titles to ids within one worker process.
+# Entries belong to a feature generation; reading with a newer generation drops them, so renames and
+# deletes made by other workers are not served from this cache.
+class FeatureIdCache:
+
+    def __init__(self, maxsize=2048):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._generation = None
+        self._lock = Lock()
+
+    # Returns the cached ids for the given titles and marks them as recently used.
+    def get_many(self, titles, generation=None):
+        found = {}
+        with self._lock:
+            self._check_generation(generation)
+            for title in titles:
+                feature_id = self._entries.get(title)
+                if feature_id is not None:
+                    self._entries.move_to_end(title)
+                    found[title] = feature_id
+        return found
+
+    # Stores title to id pairs, evicting the least recently used entries beyond maxsize.
+    # Pairs read under an outdated generation are not stored.
+    def set_many(self, mapping, generation=None):
+        with self._lock:
+            self._check_generation(generation)
+            if generation is not None and generation != self._generation:
+                return
+            for title, feature_id in mapping.items():
+                self._entries[title] = feature_id
+                self._entries.move_to_end(title)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def _check_generation(self, generation):
+        if generation is not None and (self._generation is None or generation > self._generation):
+            self._entries.clear()
+            self._generation = generation
+
+    # Removes every entry pointing to the given feature id.
+    def discard_id(self, feature_id):
+        with self._lock:
+            for title in [t for t, cached_id in self._entries.items() if cached_id == feature_id]:
+                del self._entries[title]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._generation = None
+
+
+feature_id_cache = FeatureIdCache()
+
+
+# Returns the feature generation shared by all workers, creating its row when missing.
+def get_feature_generation():
+    generation = OfferCatalog.objects.filter(pk=OFFER_CATALOG_ID).values_list("feature_generation", flat=True).first()
+    if generation is None:
+        generation = OfferCatalog.objects.get_or_create(pk=OFFER_CATALOG_ID)[0].feature_generation
+    return generation
+
+
+# Moves to a new feature generation, so every worker drops its cached title to id entries.
+def bump_feature_generation():
+    if not OfferCatalog.objects.filter(pk=OFFER_CATALOG_ID).update(feature_generation=F("feature_generation") + 1):
+        OfferCatalog.objects.get_or_create(pk=OFFER_CATALOG_ID)
+
+
+# Inserts the titles with ON CONFLICT DO NOTHING and returns title to id for all of them.
+def upsert_features(titles):
+    Feature.objects.bulk_create([Feature(title=title) for title in titles], ignore_conflicts=True)
+    return dict(Feature.objects.filter(title__in=titles).values_list("title", "id"))
+
+
+# Resolves feature titles to ids from the cache, the database, or new rows.
+# The cache is checked against the shared feature generation first; results are only cached once
+# the surrounding transaction commits.
+def resolve_feature_ids(titles):
+    titles = list(dict.fromkeys(titles))
+    generation = get_feature_generation()
+    feature_ids = feature_id_cache.get_many(titles, generation)
+    missing = [title for title in titles if title not in feature_ids]
+    if missing:
+        resolved = dict(Feature.objects.filter(title__in=missing).values_list("title", "id"))
+        unknown = [title for title in missing if title not in resolved]
+        if unknown:
+            created = upsert_features(unknown)
+            index_titles_on_commit([("feature", feature_id, title) for title, feature_id in created.items()])
+            resolved.update(created)
+        transaction.on_commit(lambda: feature_id_cache.set_many(resolved, generation))
+        feature_ids.update(resolved)
+    return feature_ids
@@ -0,0 +1,98 @@
+from time import perf_counter
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import RequestFactory
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from offer_app.api.serializers import OfferCardSerializer, OfferCardValuesSerializer
+from offer_app.models import Offer, OfferCard
+from user_auth_app.api.serializers import (
+    BusinessSerializer, BusinessValuesSerializer, CustomerSerializer, CustomerValuesSerializer,
+    ProfileSerializer, ProfileValuesSerializer)
+from user_auth_app.models import Profile
+
+
+# Management command comparing the model serializers of the list endpoints with their values() projections.
+# Runs on synthetic rows inside a transaction that is rolled back afterwards.
+class Command(BaseCommand):
+    help = "Benchmarks the list serializers against their values() projections, reported per 1000 rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1000, help="Number of synthetic rows per list.")
+        parser.add_argument("--repeat", type=int, default=5, help="Runs per serializer; the fastest one is reported.")
+
+    def handle(self, *args, **options):
+        rows, repeat = options["rows"], options["repeat"]
+        context = {"request": Request(RequestFactory().get("/api/offers/"))}
+        with transaction.atomic():
+            self.create_rows(rows)
+            benchmarks = [
+                ("offers", OfferCardSerializer, OfferCardValuesSerializer, OfferCard.objects.all()),
+                ("profiles", ProfileSerializer, ProfileValuesSerializer,
+                 Profile.objects.select_related("user", "file")),
+                ("business profiles", BusinessSerializer, BusinessValuesSerializer,
+                 Profile.objects.filter(type="business").select_related("user", "file")),
+                ("customer profiles", CustomerSerializer, CustomerValuesSerializer,
+                 Profile.objects.filter(type="customer").select_related("user", "file")),
+            ]
+            for name, serializer_class, values_serializer_class, queryset in benchmarks:
+                self.run_benchmark(name, serializer_class, values_serializer_class, queryset, context, repeat)
+            transaction.set_rollback(True)
+
+    # Inserts users with business and customer profiles and one offer card per business profile.
+    def create_rows(self, rows):
+        users = User.objects.bulk_create(
+            User(username=f"benchmark-{index}", first_name="Bench", last_name=f"User {index}",
+                 email=f"benchmark-{index}@example.com")
+            for index in range(rows * 2)
+        )
+        profiles = Profile.objects.bulk_create(
+            Profile(user=user, type="business" if index < rows else "customer", tel="0123456789",
+                    location="Berlin", description="Benchmark profile")
+            for index, user in enumerate(users)
+        )
+        now = timezone.now()
+        offers = Offer.objects.bulk_create(
+            Offer(user=profile, title=f"Offer {index}", image="offer-img/benchmark.png",
+                  description="Benchmark offer", min_price=100 + index, min_delivery_time=3)
+            for index, profile in enumerate(profiles[:rows])
+        )
+        OfferCard.objects.bulk_create(
+            OfferCard(offer=offer, user=offer.user, title=offer.title, image=offer.image,
+                      description=offer.description, created_at=now, updated_at=now,
+                      min_price=offer.min_price, min_delivery_time=offer.min_delivery_time,
+                      first_name="Bench", last_name=f"User {index}", username=f"benchmark-{index}",
+                      detail_ids=[index * 3 + 1, index * 3 + 2, index * 3 + 3])
+            for index, offer in enumerate(offers)
+        )
+
+    # Times both serializers including their queries, checks their output matches and prints the speedup.
+    def run_benchmark(self, name, serializer_class, values_serializer_class, queryset, context, repeat):
+        count = queryset.count()
+        if not count:
+            return
+        model_time, model_data = self.measure(
+            lambda: serializer_class(queryset.all(), many=True, context=context).data, repeat)
+        values_time, values_data = self.measure(
+            lambda: values_serializer_class(context=context).serialize(queryset.all()), repeat)
+        renderer = JSONRenderer()
+        identical = renderer.render(model_data) == renderer.render(values_data)
+        per_1k = 1000 / count * 1000
+        self.stdout.write(
+            f"{name}: {count} rows, model serializer {model_time * per_1k:.1f} ms/1k, "
+            f"values projection {values_time * per_1k:.1f} ms/1k, "
+            f"speedup {model_time / values_time:.1f}x, identical output: {identical}")
+
+    # Returns the fastest run time in seconds and the data of the last run.
+    def measure(self, serialize, repeat):
+        best, data = None, None
+        for _ in range(repeat):
+            start = perf_counter()
+            data = serialize()
+            elapsed = perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best, data
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from offer_app.cache import bump_offer_generation
+from offer_app.cards import sync_offer_cards
+from offer_app.models import OfferCard
+
+
+# Management command rebuilding the offer list read model from scratch.
+# Runs in one transaction, so the offer list keeps serving the old cards until the new ones are committed.
+class Command(BaseCommand):
+    help = "Rebuilds the OfferCard rows of all offers."
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            OfferCard.objects.all().delete()
+            sync_offer_cards()
+            bump_offer_generation()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {OfferCard.objects.count()} offer cards."))
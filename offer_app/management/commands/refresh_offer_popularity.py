@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from offer_app.cache import bump_offer_generation
+from offer_app.popularity import refresh_order_counts
+
+
+# Management command recounting the order counters of all offers, e.g. daily to expire the recent window.
+class Command(BaseCommand):
+    help = "Recomputes order_count and recent_order_count of all offers and offer cards from the orders."
+
+    def handle(self, *args, **options):
+        updated = refresh_order_counts()
+        bump_offer_generation()
+        self.stdout.write(self.style.SUCCESS(f"Refreshed order counters of {updated} offers."))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from offer_app.cache import bump_offer_generation
+from offer_app.cards import sync_card_min_values
+from offer_app.models import Offer
+
+
+# Management command recomputing the denormalized minimum values of all offers and their cards.
+# Run it after bulk imports or QuerySet updates of offer details, which bypass the detail signals.
+class Command(BaseCommand):
+    help = "Recomputes min_price and min_delivery_time of all offers from their details and copies them onto the offer cards."
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            updated = Offer.objects.refresh_min_values()
+            sync_card_min_values()
+            bump_offer_generation()
+        self.stdout.write(self.style.SUCCESS(f"Repaired minimum values of {updated} offers."))
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.1 on 2026-10-17 06:47
+
+from django.db import migrations, models
+
+
+# Merges features sharing a title into the one with the lowest id before the title becomes unique.
+def merge_duplicate_features(apps, schema_editor):
+    Feature = apps.get_model("offer_app", "Feature")
+    OfferDetail = apps.get_model("offer_app", "OfferDetail")
+    Through = OfferDetail.features.through
+    duplicates = (
+        Feature.objects.values("title")
+        .annotate(count=models.Count("id"), keep_id=models.Min("id"))
+        .filter(count__gt=1)
+    )
+    for duplicate in duplicates:
+        keep_id = duplicate["keep_id"]
+        other_ids = list(
+            Feature.objects.filter(title=duplicate["title"]).exclude(id=keep_id).values_list("id", flat=True))
+        linked = set(Through.objects.filter(feature_id=keep_id).values_list("offerdetail_id", flat=True))
+        for row in Through.objects.filter(feature_id__in=other_ids):
+            if row.offerdetail_id not in linked:
+                Through.objects.create(offerdetail_id=row.offerdetail_id, feature_id=keep_id)
+                linked.add(row.offerdetail_id)
+        Feature.objects.filter(id__in=other_ids).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('offer_app', '0004_offer_offer_user_updated_idx_offer_offer_updated_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_features, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='feature',
+            name='title',
+            field=models.CharField(max_length=255, unique=True),
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.1 on 2026-10-17 06:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# Builds the cards of all existing offers.
+def create_offer_cards(apps, schema_editor):
+    Offer = apps.get_model("offer_app", "Offer")
+    OfferCard = apps.get_model("offer_app", "OfferCard")
+    cards = []
+    for offer in Offer.objects.select_related("user__user").prefetch_related("details"):
+        user = offer.user.user
+        cards.append(OfferCard(
+            offer_id=offer.pk, user_id=offer.user_id, title=offer.title, image=offer.image.name,
+            description=offer.description, created_at=offer.created_at, updated_at=offer.updated_at,
+            min_price=offer.min_price, min_delivery_time=offer.min_delivery_time,
+            first_name=user.first_name, last_name=user.last_name, username=user.username,
+            detail_ids=[detail.id for detail in sorted(offer.details.all(), key=lambda detail: detail.title)],
+        ))
+    OfferCard.objects.bulk_create(cards, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('offer_app', '0005_feature_title_unique'),
+        ('user_auth_app', '0014_alter_profile_description_alter_profile_location'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OfferCard',
+            fields=[
+                ('offer', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='card', serialize=False, to='offer_app.offer')),
+                ('title', models.CharField(max_length=255)),
+                ('image', models.FileField(blank=True, max_length=255, upload_to='offer-img/')),
+                ('description', models.CharField(max_length=255)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('min_price', models.IntegerField()),
+                ('min_delivery_time', models.IntegerField()),
+                ('first_name', models.CharField(blank=True, max_length=150)),
+                ('last_name', models.CharField(blank=True, max_length=150)),
+                ('username', models.CharField(max_length=150)),
+                ('detail_ids', models.JSONField(default=list)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='offer_cards', to='user_auth_app.profile')),
+            ],
+            options={
+                'verbose_name': 'Offer Card',
+                'verbose_name_plural': 'Offer Cards',
+                'ordering': ['user'],
+                'indexes': [models.Index(fields=['user', 'updated_at'], name='card_user_updated_idx'), models.Index(fields=['updated_at', 'offer'], name='card_updated_idx'), models.Index(fields=['min_price', 'offer'], name='card_min_price_idx'), models.Index(fields=['min_delivery_time', 'updated_at'], name='card_delivery_updated_idx')],
+            },
+        ),
+        migrations.RunPython(create_offer_cards, migrations.RunPython.noop),
+    ]
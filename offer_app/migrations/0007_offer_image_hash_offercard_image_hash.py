@@ -0,0 +1,23 @@
+# Generated by Django 5.2.1 on 2026-10-17 06:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('offer_app', '0006_offercard'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='offer',
+            name='image_hash',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='offercard',
+            name='image_hash',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 5.2.1 on 2026-10-17 07:14
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+
+# Counts the existing non-cancelled orders of every offer and copies them onto the cards.
+def count_offer_orders(apps, schema_editor):
+    Offer = apps.get_model("offer_app", "Offer")
+    OfferCard = apps.get_model("offer_app", "OfferCard")
+    Order = apps.get_model("order_app", "Order")
+    orders = Order.objects.filter(offer_detail__offer=OuterRef("pk")).exclude(
+        status="cancelled").order_by().values("offer_detail__offer")
+    recent_orders = orders.filter(
+        created_at__gte=timezone.now() - timedelta(days=settings.RECENT_ORDER_WINDOW_DAYS))
+    Offer.objects.update(
+        order_count=Coalesce(Subquery(orders.annotate(count=Count("pk")).values("count")), 0),
+        recent_order_count=Coalesce(Subquery(recent_orders.annotate(count=Count("pk")).values("count")), 0),
+    )
+    offers = Offer.objects.filter(pk=OuterRef("offer"))
+    OfferCard.objects.update(
+        order_count=Subquery(offers.values("order_count")),
+        recent_order_count=Subquery(offers.values("recent_order_count")),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('offer_app', '0007_offer_image_hash_offercard_image_hash'),
+        ('order_app', '0006_order_order_business_status_idx'),
+        ('user_auth_app', '0016_profile_location_grid'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='offer',
+            name='order_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='offer',
+            name='recent_order_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='offercard',
+            name='order_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='offercard',
+            name='recent_order_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='offercard',
+            index=models.Index(fields=['order_count', 'offer'], name='card_order_count_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='offercard',
+            index=models.Index(fields=['recent_order_count', 'offer'], name='card_recent_order_count_idx'),
+        ),
+        migrations.RunPython(count_offer_orders, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.1 on 2026-10-17 08:01
+
+import time
+from django.db import migrations, models
+
+
+# Creates the row holding the catalog generation.
+def create_offer_catalog(apps, schema_editor):
+    OfferCatalog = apps.get_model("offer_app", "OfferCatalog")
+    OfferCatalog.objects.get_or_create(pk=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('offer_app', '0008_offer_order_counts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OfferCatalog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('generation', models.BigIntegerField(default=time.time_ns)),
+            ],
+            options={
+                'verbose_name': 'Offer Catalog',
+                'verbose_name_plural': 'Offer Catalog',
+            },
+        ),
+        migrations.RunPython(create_offer_catalog, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.1 on 2026-10-17 08:27
+
+import time
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('offer_app', '0009_offer_catalog'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='offercatalog',
+            name='feature_generation',
+            field=models.BigIntegerField(default=time.time_ns),
+        ),
+    ]
@@ -1,8 +1,27 @@
+import time
+
 from django.db import models
+from django.db.models import F, Min, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 
 from user_auth_app.models import Profile
 
 
+# QuerySet with bulk maintenance helpers for offers.
+class OfferQuerySet(models.QuerySet):
+
+    # Recomputes min_price and min_delivery_time from the details in one UPDATE statement.
+    def refresh_min_values(self, **extra_fields):
+        details = OfferDetail.objects.filter(offer=OuterRef("pk")).order_by().values("offer")
+        return self.update(
+            min_price=Coalesce(
+                Subquery(details.annotate(value=Min("price")).values("value")), F("min_price")),
+            min_delivery_time=Coalesce(
+                Subquery(details.annotate(value=Min("delivery_time_in_days")).values("value")), F("min_delivery_time")),
+            **extra_fields,
+        )
+
+
 # Represents an offer with user, title, image, and pricing info.
 class Offer(models.Model):
     user = models.ForeignKey(
@@ -10,16 +29,27 @@ class Offer(models.Model):
     title = models.CharField(max_length=255)
     image = models.FileField(upload_to="offer-img/",
                              max_length=255, blank=True)
+    image_hash = models.CharField(max_length=64, blank=True, default="")
     description = models.CharField(max_length=255)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     min_price = models.IntegerField()
     min_delivery_time = models.IntegerField()
+    order_count = models.IntegerField(default=0)
+    recent_order_count = models.IntegerField(default=0)
+
+    objects = OfferQuerySet.as_manager()
 
     class Meta:
         verbose_name = "Offer"
         verbose_name_plural = "Offers"
         ordering = ["user"]
+        indexes = [
+            models.Index(fields=["user", "updated_at"], name="offer_user_updated_idx"),
+            models.Index(fields=["updated_at", "id"], name="offer_updated_idx"),
+            models.Index(fields=["min_price", "id"], name="offer_min_price_idx"),
+            models.Index(fields=["min_delivery_time", "updated_at"], name="offer_delivery_updated_idx"),
+        ]
 
     def __str__(self):
         return self.title
@@ -27,7 +57,7 @@ class Offer(models.Model):
 
 # Stores features that can be linked to offers.
 class Feature(models.Model):
-    title = models.CharField(max_length=255)
+    title = models.CharField(max_length=255, unique=True)
 
     class Meta:
         verbose_name = "Feature"
@@ -56,3 +86,58 @@ class OfferDetail(models.Model):
 
     def __str__(self):
         return self.title
+
+
+
+# Denormalized read model of an offer as shown by the offer list.
+class OfferCard(models.Model):
+    offer = models.OneToOneField(
+        Offer, on_delete=models.CASCADE, primary_key=True, related_name="card")
+    user = models.ForeignKey(
+        Profile, on_delete=models.CASCADE, related_name="offer_cards")
+    title = models.CharField(max_length=255)
+    image = models.FileField(upload_to="offer-img/",
+                             max_length=255, blank=True)
+    image_hash = models.CharField(max_length=64, blank=True, default="")
+    description = models.CharField(max_length=255)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    min_price = models.IntegerField()
+    min_delivery_time = models.IntegerField()
+    first_name = models.CharField(max_length=150, blank=True)
+    last_name = models.CharField(max_length=150, blank=True)
+    username = models.CharField(max_length=150)
+    detail_ids = models.JSONField(default=list)
+    order_count = models.IntegerField(default=0)
+    recent_order_count = models.IntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Offer Card"
+        verbose_name_plural = "Offer Cards"
+        ordering = ["user"]
+        indexes = [
+            models.Index(fields=["user", "updated_at"], name="card_user_updated_idx"),
+            models.Index(fields=["updated_at", "offer"], name="card_updated_idx"),
+            models.Index(fields=["min_price", "offer"], name="card_min_price_idx"),
+            models.Index(fields=["min_delivery_time", "updated_at"], name="card_delivery_updated_idx"),
+            models.Index(fields=["order_count", "offer"], name="card_order_count_idx"),
+            models.Index(fields=["recent_order_count", "offer"], name="card_recent_order_count_idx"),
+        ]
+
+    def __str__(self):
+        return self.title
+
+
+# Single row holding the generations of the offer catalog, shared by all workers through the database.
+# Cached offer list pages and their ETags are keyed by generation, the per-worker feature title cache by
+# feature_generation; both start from the clock so caches filled for an earlier database are never reused.
+class OfferCatalog(models.Model):
+    generation = models.BigIntegerField(default=time.time_ns)
+    feature_generation = models.BigIntegerField(default=time.time_ns)
+
+    class Meta:
+        verbose_name = "Offer Catalog"
+        verbose_name_plural = "Offer Catalog"
+
+    def __str__(self):
+        return str(self.generation)
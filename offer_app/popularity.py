@@ -0,0 +1,80 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from offer_app.models import Offer, OfferCard
+from order_app.models import Order
+
+
+# Order statuses that do not count towards an offer's popularity.
+UNCOUNTED_STATUSES = ["cancelled"]
+
+
+# Returns the start of the recent order window.
+def get_recent_since():
+    return timezone.now() - timedelta(days=settings.RECENT_ORDER_WINDOW_DAYS)
+
+
+# Checks whether an order in the given status counts towards popularity.
+def is_counted(status):
+    return status not in UNCOUNTED_STATUSES
+
+
+# Adds delta to the order counters of an offer and its card with F() expressions.
+# The recent counter only changes for orders created inside the recent window.
+def add_offer_orders(offer_id, delta, recent=True):
+    values = {"order_count": F("order_count") + delta}
+    if recent:
+        values["recent_order_count"] = F("recent_order_count") + delta
+    Offer.objects.filter(pk=offer_id).update(**values)
+    OfferCard.objects.filter(offer_id=offer_id).update(**values)
+
+
+# Returns the offer id of an order, or None for orders without an offer detail.
+def get_order_offer_id(order):
+    if order.offer_detail_id is None:
+        return None
+    return order.offer_detail.offer_id
+
+
+# Counts a newly placed order.
+def record_order_created(order):
+    offer_id = get_order_offer_id(order)
+    if offer_id is not None and is_counted(order.status):
+        add_offer_orders(offer_id, 1)
+
+
+# Adjusts the counters after an order moved between counted and uncounted statuses.
+def record_order_status_change(order, previous_status):
+    delta = is_counted(order.status) - is_counted(previous_status)
+    offer_id = get_order_offer_id(order)
+    if delta and offer_id is not None:
+        add_offer_orders(offer_id, delta, recent=order.created_at >= get_recent_since())
+
+
+# Removes a deleted order from the counters.
+def record_order_deleted(order):
+    offer_id = get_order_offer_id(order)
+    if offer_id is not None and is_counted(order.status):
+        add_offer_orders(offer_id, -1, recent=order.created_at >= get_recent_since())
+
+
+# Recomputes both counters of all offers and cards from the orders, expiring orders
+# that left the recent window. Returns the number of updated offers.
+def refresh_order_counts():
+    orders = Order.objects.filter(offer_detail__offer=OuterRef("pk")).exclude(
+        status__in=UNCOUNTED_STATUSES).order_by().values("offer_detail__offer")
+    recent_orders = orders.filter(created_at__gte=get_recent_since())
+    updated = Offer.objects.update(
+        order_count=Coalesce(Subquery(orders.annotate(count=Count("pk")).values("count")), 0),
+        recent_order_count=Coalesce(Subquery(recent_orders.annotate(count=Count("pk")).values("count")), 0),
+    )
+    offers = Offer.objects.filter(pk=OuterRef("offer"))
+    OfferCard.objects.update(
+        order_count=Subquery(offers.values("order_count")),
+        recent_order_count=Subquery(offers.values("recent_order_count")),
+    )
+    return updated
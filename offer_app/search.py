@@ -0,0 +1,75 @@
+from django.db import connections
+
+
+# Name of the SQLite FTS5 table indexing offer titles and descriptions.
+FTS_TABLE = "offer_app_offer_fts"
+
+# Statements creating the external-content FTS5 index and the triggers keeping it in sync.
+FTS_SCHEMA = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, description,
+        content='offer_app_offer', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON offer_app_offer BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON offer_app_offer BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF title, description ON offer_app_offer BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END""",
+]
+
+# Caches per database alias whether the FTS index is available.
+_fts_available = {}
+
+
+# Checks whether the SQLite build supports FTS5.
+def supports_fts5(connection):
+    if connection.vendor != "sqlite":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("PRAGMA compile_options")
+        return any(row[0] == "ENABLE_FTS5" for row in cursor.fetchall())
+
+
+# Creates the FTS index and its triggers if missing, rebuilding it when newly created.
+# Runs after every migrate because SQLite table rebuilds drop the triggers.
+def install_search_index(using="default", **kwargs):
+    connection = connections[using]
+    if not supports_fts5(connection):
+        _fts_available[using] = False
+        return
+    table_names = connection.introspection.table_names()
+    if "offer_app_offer" not in table_names:
+        return
+    with connection.cursor() as cursor:
+        for statement in FTS_SCHEMA:
+            cursor.execute(statement)
+        if FTS_TABLE not in table_names:
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+    _fts_available[using] = True
+
+
+# Returns whether full-text search can be used on the given database alias.
+def has_search_index(using):
+    if using not in _fts_available:
+        connection = connections[using]
+        _fts_available[using] = (
+            connection.vendor == "sqlite"
+            and FTS_TABLE in connection.introspection.table_names()
+        )
+    return _fts_available[using]
+
+
+# Builds an FTS5 MATCH expression requiring every term as a quoted prefix phrase.
+def build_match_query(terms):
+    phrases = ['"{}"*'.format(term.replace('"', '""')) for term in terms if term.strip()]
+    return " ".join(phrases)
@@ -0,0 +1,174 @@
+from django.contrib.auth.models import User
+from django.db.models import QuerySet
+from django.db.models.signals import m2m_changed, post_delete, post_init, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from core.images import image_processed, remember_stored_file, remember_upload_digest, schedule_image_processing
+from offer_app.cache import bump_offer_generation
+from offer_app.cards import build_offer_card, save_offer_cards, sync_offer_cards, sync_owner_names
+from offer_app.features import bump_feature_generation, feature_id_cache
+from offer_app.models import Feature, Offer, OfferCard, OfferDetail
+from offer_app.suggest import index_titles_on_commit, unindex_title_on_commit
+from user_auth_app.models import Profile
+
+
+# Drops cached title to id entries when a feature is renamed or deleted, here right away
+# and in the other workers through the shared feature generation.
+@receiver(post_save, sender=Feature)
+@receiver(post_delete, sender=Feature)
+def invalidate_feature_cache(sender, instance, created=False, **kwargs):
+    feature_id_cache.discard_id(instance.pk)
+    if not created:
+        bump_feature_generation()
+
+
+# Checks whether a detail is deleted because its offer (or owner) is being deleted.
+def is_cascade_delete(kwargs):
+    origin = kwargs.get("origin")
+    if origin is None:
+        return False
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return model is not OfferDetail
+
+
+# Keeps the offer's minimum price and delivery time in sync with detail saves and deletes.
+# bulk_create, bulk_update and QuerySet.update send no signals; code using them refreshes the offer
+# itself, and other bulk writes are fixed up with the repair_offer_min_values command.
+@receiver(post_save, sender=OfferDetail)
+@receiver(post_delete, sender=OfferDetail)
+def refresh_offer_min_values(sender, instance, **kwargs):
+    if is_cascade_delete(kwargs):
+        return
+    Offer.objects.filter(pk=instance.offer_id).refresh_min_values(updated_at=timezone.now())
+
+
+# Marks the offers of the given details as modified, so their ETags and Last-Modified change.
+def touch_detail_offers(details):
+    offer_ids = details.values("offer_id")
+    updated_at = timezone.now()
+    Offer.objects.filter(pk__in=offer_ids).update(updated_at=updated_at)
+    OfferCard.objects.filter(offer_id__in=offer_ids).update(updated_at=updated_at)
+
+
+# Touches the offers whose details gained or lost features through the many-to-many API.
+# A reverse clear is handled before the links are gone, while the details can still be found.
+@receiver(m2m_changed, sender=OfferDetail.features.through)
+def touch_offers_on_feature_links(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action in ["post_add", "post_remove", "post_clear"]:
+            touch_detail_offers(OfferDetail.objects.filter(pk=instance.pk))
+    elif action in ["post_add", "post_remove"]:
+        touch_detail_offers(OfferDetail.objects.filter(pk__in=pk_set))
+    elif action == "pre_clear":
+        touch_detail_offers(instance.offerdetail_set.all())
+
+
+# Touches the offers showing a feature when it is renamed.
+@receiver(post_save, sender=Feature)
+def touch_offers_on_feature_save(sender, instance, created, **kwargs):
+    if not created:
+        touch_detail_offers(instance.offerdetail_set.all())
+
+
+# Keeps the offer card in sync with the offer, unless the caller writes the card itself.
+@receiver(post_save, sender=Offer)
+def sync_card_on_offer_save(sender, instance, created, **kwargs):
+    if getattr(instance, "_skip_card_sync", False):
+        return
+    details = [] if created else instance.details.all()
+    save_offer_cards([build_offer_card(instance, details)])
+
+
+# Keeps the hash of a streamed offer image upload for the pipeline.
+@receiver(pre_save, sender=Offer)
+def remember_offer_image_digest(sender, instance, **kwargs):
+    remember_upload_digest(instance, "image")
+
+
+# Records the stored offer image name to detect replaced images.
+@receiver(post_init, sender=Offer)
+def remember_offer_image(sender, instance, **kwargs):
+    remember_stored_file(instance, "image")
+
+
+# Generates the image variants of a new or replaced offer image in the background.
+@receiver(post_save, sender=Offer)
+def process_offer_image(sender, instance, created, **kwargs):
+    schedule_image_processing(instance, "image", "image_hash", created)
+
+
+# Publishes the variants of a processed offer image on its card.
+@receiver(image_processed, sender=Offer)
+def publish_offer_image_variants(sender, instance, digest, **kwargs):
+    OfferCard.objects.filter(offer_id=instance.pk).update(image_hash=digest)
+    bump_offer_generation()
+
+
+# Rebuilds the offer card after a detail write, once the minimums are refreshed.
+@receiver(post_save, sender=OfferDetail)
+@receiver(post_delete, sender=OfferDetail)
+def sync_card_on_detail_write(sender, instance, **kwargs):
+    if is_cascade_delete(kwargs):
+        return
+    sync_offer_cards([instance.offer_id])
+
+
+# User fields copied onto the cards of the user's offers.
+OWNER_NAME_FIELDS = {"first_name", "last_name", "username"}
+
+# Profile fields that change the offer list: the owner and the location used by the near filter.
+PROFILE_LIST_FIELDS = {"user", "type", "location", "latitude", "longitude", "grid_lat", "grid_lng"}
+
+
+# Checks whether a save may have written one of the given fields.
+def saved_any(update_fields, fields):
+    return update_fields is None or not fields.isdisjoint(update_fields)
+
+
+# Copies changed owner names of business users onto the offer cards.
+@receiver(post_save, sender=User)
+def sync_cards_on_user_save(sender, instance, created, update_fields=None, **kwargs):
+    if created or not saved_any(update_fields, OWNER_NAME_FIELDS):
+        return
+    if instance.profiles.filter(type="business").exists():
+        sync_owner_names(instance)
+        bump_offer_generation()
+
+
+# Copies the owner names after a business profile is saved, as it may point to another user,
+# and invalidates cached offer lists whose near filter depends on its location.
+@receiver(post_save, sender=Profile)
+def sync_cards_on_profile_save(sender, instance, created, update_fields=None, **kwargs):
+    if created or instance.type != "business" or not saved_any(update_fields, PROFILE_LIST_FIELDS):
+        return
+    if saved_any(update_fields, {"user"}):
+        sync_owner_names(instance.user)
+    bump_offer_generation()
+
+
+# Invalidates cached offer lists when the catalog changes.
+@receiver(post_save, sender=Offer)
+@receiver(post_delete, sender=Offer)
+@receiver(post_save, sender=OfferDetail)
+@receiver(post_delete, sender=OfferDetail)
+@receiver(post_save, sender=Feature)
+@receiver(post_delete, sender=Feature)
+@receiver(m2m_changed, sender=OfferDetail.features.through)
+def invalidate_offer_lists(sender, **kwargs):
+    bump_offer_generation()
+
+
+# Keeps the title autocomplete index in step with saved offers and features.
+@receiver(post_save, sender=Offer)
+@receiver(post_save, sender=Feature)
+def index_suggestion(sender, instance, **kwargs):
+    kind = "offer" if sender is Offer else "feature"
+    index_titles_on_commit([(kind, instance.pk, instance.title)])
+
+
+# Removes deleted offers and features from the title autocomplete index.
+@receiver(post_delete, sender=Offer)
+@receiver(post_delete, sender=Feature)
+def unindex_suggestion(sender, instance, **kwargs):
+    unindex_title_on_commit("offer" if sender is Offer else "feature", instance.pk)
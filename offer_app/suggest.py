@@ -0,0 +1,176 @@
+from bisect import bisect_left, insort
+import heapq
+import logging
+import re
+from threading import Lock, Thread
+from time import monotonic
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Count
+
+from offer_app.models import Feature, Offer
+
+
+logger = logging.getLogger(__name__)
+
+
+# Normalizes text for case-insensitive prefix matching.
+def normalize(text):
+    return re.sub(r"\s+", " ", text).strip().casefold()
+
+
+# Returns every suffix of a normalized title that starts at a word, so inner words match too.
+def get_word_suffixes(title):
+    normalized = normalize(title)
+    return [normalized[match.start():] for match in re.finditer(r"\S+", normalized)]
+
+
+# Per-process autocomplete index of offer and feature titles.
+# Keys are (suffix, kind, id) tuples in a sorted list, so a prefix lookup is one bisect.
+# The first search builds the index; afterwards committed writes keep it current and,
+# once it is older than SUGGEST_INDEX_TTL, a background thread reloads it to pick up writes
+# made by other processes while searches keep using the current index.
+class SuggestionIndex:
+    max_candidates = 1000
+
+    def __init__(self):
+        self._keys = []
+        self._titles = {}
+        self._popularity = {}
+        self._built_at = None
+        self._pending = None
+        self._refreshing = False
+        self._lock = Lock()
+
+    # Returns up to limit entries whose title has a word starting with the query,
+    # titles starting with the query first, then by popularity, length and title.
+    def search(self, query, limit=10):
+        prefix = normalize(query)
+        if not prefix:
+            return []
+        self.ensure_fresh()
+        candidates = set()
+        with self._lock:
+            position = bisect_left(self._keys, (prefix,))
+            while position < len(self._keys) and len(candidates) < self.max_candidates:
+                suffix, kind, pk = self._keys[position]
+                if not suffix.startswith(prefix):
+                    break
+                candidates.add((kind, pk))
+                position += 1
+            ranked = [
+                (not normalize(self._titles[item]).startswith(prefix), -self._popularity.get(item, 0),
+                 len(self._titles[item]), self._titles[item], item)
+                for item in candidates
+            ]
+        return [
+            {"type": kind, "id": pk, "title": title}
+            for _, _, _, title, (kind, pk) in heapq.nsmallest(limit, ranked)
+        ]
+
+    # Adds or replaces the entries of the given (kind, id, title) items, keeping their popularity.
+    def add_many(self, items):
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append(("add", items))
+            if self._built_at is None:
+                return
+            self._add_many(items)
+
+    # Removes the entry of one item.
+    def remove(self, kind, pk):
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append(("remove", (kind, pk)))
+            self._remove(kind, pk)
+
+    def _add_many(self, items):
+        for kind, pk, title in items:
+            self._remove(kind, pk)
+            self._titles[kind, pk] = title
+            for suffix in get_word_suffixes(title):
+                insort(self._keys, (suffix, kind, pk))
+
+    def _remove(self, kind, pk):
+        title = self._titles.pop((kind, pk), None)
+        if title is None:
+            return
+        for suffix in get_word_suffixes(title):
+            position = bisect_left(self._keys, (suffix, kind, pk))
+            if position < len(self._keys) and self._keys[position] == (suffix, kind, pk):
+                del self._keys[position]
+
+    # Builds the index on first use and refreshes it in the background once it is older than the TTL.
+    def ensure_fresh(self):
+        built_at = self._built_at
+        if built_at is None:
+            self.rebuild()
+        elif monotonic() - built_at > settings.SUGGEST_INDEX_TTL:
+            with self._lock:
+                if self._refreshing:
+                    return
+                self._refreshing = True
+            self.start_refresh()
+
+    # Starts the background thread reloading the index.
+    def start_refresh(self):
+        Thread(target=self.refresh, name="suggest-index", daemon=True).start()
+
+    # Reloads the index outside the request cycle and releases the thread's database connection.
+    def refresh(self):
+        try:
+            self.rebuild()
+        except Exception:
+            logger.exception("Could not rebuild the suggestion index.")
+        finally:
+            with self._lock:
+                self._refreshing = False
+            close_old_connections()
+
+    # Loads all offer and feature titles with their popularity and swaps in a freshly sorted index.
+    # Writes committed while loading are replayed on the new index, so none are lost.
+    def rebuild(self):
+        with self._lock:
+            if self._pending is None:
+                self._pending = []
+        try:
+            titles, popularity = {}, {}
+            for pk, title, order_count in Offer.objects.values_list("pk", "title", "order_count"):
+                titles["offer", pk], popularity["offer", pk] = title, order_count
+            features = Feature.objects.annotate(usage=Count("offerdetail")).values_list("pk", "title", "usage")
+            for pk, title, usage in features:
+                titles["feature", pk], popularity["feature", pk] = title, usage
+            keys = sorted(
+                (suffix, kind, pk) for (kind, pk), title in titles.items() for suffix in get_word_suffixes(title))
+        except Exception:
+            with self._lock:
+                self._pending = None
+            raise
+        with self._lock:
+            pending, self._pending = self._pending or [], None
+            self._keys, self._titles, self._popularity, self._built_at = keys, titles, popularity, monotonic()
+            for change, value in pending:
+                if change == "add":
+                    self._add_many(value)
+                else:
+                    self._remove(*value)
+
+    # Drops the index; it is rebuilt on the next search.
+    def clear(self):
+        with self._lock:
+            self._keys, self._titles, self._popularity, self._built_at = [], {}, {}, None
+
+
+suggestion_index = SuggestionIndex()
+
+
+# Adds the given (kind, id, title) items to the index once the current transaction commits.
+def index_titles_on_commit(items):
+    if items:
+        transaction.on_commit(lambda: suggestion_index.add_many(items))
+
+
+# Removes an item from the index once the current transaction commits.
+def unindex_title_on_commit(kind, pk):
+    transaction.on_commit(lambda: suggestion_index.remove(kind, pk))
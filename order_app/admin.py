@@ -1,6 +1,7 @@
 from django.contrib import admin
 
-from order_app.models import Order
+from order_app.models import BusinessOrderStats, Order
 
 # Registers the Order model in the Django admin site.
 admin.site.register(Order)
+admin.site.register(BusinessOrderStats)
@@ -0,0 +1,31 @@
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+
+from core.pagination import KeysetPagination
+
+
+# Keyset pagination of orders by creation time with the id as tiebreaker.
+class OrderCursorPagination(KeysetPagination):
+    page_size = 20
+    keyset_fields = ["created_at"]
+    datetime_fields = ["created_at"]
+    default_keyset_field = "created_at"
+
+
+# Pages orders only when a cursor or "pagination=cursor" is requested,
+# so clients that do not ask still receive a plain list, capped at max_unpaginated_results.
+class OrderPagination(BasePagination):
+    cursor_pagination_class = OrderCursorPagination
+    max_unpaginated_results = 100
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_paginator = None
+        if not self.cursor_pagination_class.is_requested(request):
+            return list(queryset[:self.max_unpaginated_results])
+        self.cursor_paginator = self.cursor_pagination_class()
+        return self.cursor_paginator.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is None:
+            return Response(data)
+        return self.cursor_paginator.get_paginated_response(data)
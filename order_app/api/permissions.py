@@ -5,6 +5,7 @@ from user_auth_app.models import Profile
 
 
 # Permission class that allows only users with a 'customer' profile type.
+# Keeps the loaded profile on the request for the view.
 class IsCustomerUser(BasePermission):
 
     def has_permission(self, request, view):
@@ -13,12 +14,14 @@ class IsCustomerUser(BasePermission):
             customer_profile = Profile.objects.get(user=user)
             if customer_profile.type != "customer":
                 return False
+            request.profile = customer_profile
             return True
         except Profile.DoesNotExist:
             raise NotFound("Profile was not found!")
         
 
 # Permission class that allows only users with a 'business' profile type.
+# Keeps the loaded profile on the request for the view.
 class IsBusinessUser(BasePermission):
 
     def has_permission(self, request, view):
@@ -27,6 +30,7 @@ class IsBusinessUser(BasePermission):
             business_profile = Profile.objects.get(user=user)
             if business_profile.type != "business":
                 return False
+            request.profile = business_profile
             return True
         except Profile.DoesNotExist:
             raise NotFound("Profile was not found!")
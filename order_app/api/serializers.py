@@ -3,16 +3,9 @@ from rest_framework import serializers
 from order_app.models import Order
 
 
-# Serializer for Order model, including offer detail fields.
+# Serializer for Order model, rendering the offer detail terms snapshotted onto the order.
 class OrderSerializer(serializers.ModelSerializer):
-    title = serializers.CharField(source="offer_detail.title", read_only=True)
-    revisions = serializers.IntegerField(source="offer_detail.revisions", read_only=True)
-    delivery_time_in_days = serializers.IntegerField(source="offer_detail.delivery_time_in_days", read_only=True)
-    price = serializers.IntegerField(source="offer_detail.price", read_only=True)
-    features = serializers.SlugRelatedField(
-        many=True, read_only=True, slug_field="title", source="offer_detail.features"
-    )
-    offer_type = serializers.CharField(source="offer_detail.offer_type", read_only=True)
+    features = serializers.ListField(child=serializers.CharField(), read_only=True)
 
     class Meta:
         model = Order
@@ -27,9 +20,11 @@ class OrderSerializer(serializers.ModelSerializer):
             "features",
             "offer_type",
             "status",
+            "version",
             "created_at",
             "updated_at"
         ]
+        read_only_fields = ["title", "revisions", "delivery_time_in_days", "price", "offer_type", "version"]
 
 
 # Serializer for returning order count.
@@ -39,4 +34,9 @@ class OrderCountSerializer(serializers.Serializer):
 
 # Serializer for returning completed order count.
 class CompletedOrderSerializer(serializers.Serializer):
-    completed_order_count = serializers.IntegerField()
\ No newline at end of file
+    completed_order_count = serializers.IntegerField()
+
+
+# Serializer for the in-progress and completed order counts of one business user in a batch.
+class BusinessOrderCountSerializer(OrderCountSerializer, CompletedOrderSerializer):
+    business_user_id = serializers.IntegerField()
@@ -1,7 +1,7 @@
 from django.urls import path
 from rest_framework.routers import DefaultRouter
 
-from order_app.api.views import CompletedOrderView, OrderCountView, OrderViewSet
+from order_app.api.views import BusinessOrderCountsView, CompletedOrderView, OrderCountView, OrderViewSet
 
 
 # Router for registering viewsets
@@ -12,6 +12,7 @@ router.register(r'orders', OrderViewSet, basename="orders")
 urlpatterns = [
     path("order-count/<int:business_user_id>/", OrderCountView.as_view(), name="order-count"), 
     path("completed-order-count/<int:business_user_id>/", CompletedOrderView.as_view(), name="completed-order"), 
+    path("order-counts/", BusinessOrderCountsView.as_view(), name="order-counts"),
 ]
 
 # Add router URLs to urlpatterns
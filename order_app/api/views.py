@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import transaction
 from drf_spectacular.utils import OpenApiParameter, OpenApiResponse, extend_schema
 from rest_framework import status
 from rest_framework.exceptions import PermissionDenied, ValidationError
@@ -7,26 +7,35 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.viewsets import ModelViewSet
 
+from core.idempotency import idempotent
+from core.streaming import stream_json_list
 from offer_app.admin import OfferDetail
+from offer_app.popularity import record_order_created, record_order_deleted, record_order_status_change
+from order_app.api.pagination import OrderPagination
 from order_app.api.permissions import IsBusinessUser, IsCustomerUser
-from order_app.api.serializers import CompletedOrderSerializer, OrderCountSerializer, OrderSerializer
-from order_app.models import STATUS_CHOICE, Order
+from order_app.api.serializers import (
+    BusinessOrderCountSerializer, CompletedOrderSerializer, OrderCountSerializer, OrderSerializer)
+from order_app.models import STATUS_CHOICE, Order, can_transition, get_offer_detail_terms
+from order_app.stats import (
+    get_business_order_stats, record_business_order_created, record_business_order_deleted,
+    record_business_order_status_change)
 from user_auth_app.models import Profile
 
 
 # ViewSet for handling Order CRUD operations and permissions.
 class OrderViewSet(ModelViewSet):
     serializer_class = OrderSerializer
+    pagination_class = OrderPagination
+    stream_query_param = "stream"
+    stream_chunk_size = 500
 
     # Returns the queryset of orders for the current user or all orders for admins.
+    # Orders carry their own copy of the offer detail terms, so no related rows are loaded.
     def get_queryset(self):
         user = self.request.user
         if user.is_staff:
             return Order.objects.all()
-        profile = user.profiles.first()
-        return Order.objects.filter(
-            models.Q(customer_user=profile) | models.Q(business_user=profile)
-        ).distinct()
+        return Order.objects.visible_to(user)
 
     # Returns the appropriate permissions depending on action.
     def get_permissions(self):
@@ -44,20 +53,29 @@ class OrderViewSet(ModelViewSet):
         summary="List orders of the current user",
         description=(
             "Returns all orders where the current authenticated user is either the customer or the business user. "
-            "Admins see all orders."
+            "Admins see all orders. Without parameters at most 100 orders are returned. "
+            "Pass `pagination=cursor` to page by creation time with stable cursors, "
+            "or `stream=true` to stream the full list as one JSON array."
         ),
         tags=["Order"],
         responses={200: OrderSerializer(many=True)}
     )
     # Returns a list of orders for the current user or all orders for admins.
+    # Pages by (created_at, id) on request, streams the whole list with stream=true, or caps the plain list.
     def list(self, request, *args, **kwargs):
+        if request.query_params.get(self.stream_query_param) == "true":
+            queryset = self.filter_queryset(self.get_queryset()).order_by("created_at", "pk")
+            return stream_json_list(
+                queryset, self.get_serializer_class(), self.get_serializer_context(), self.stream_chunk_size)
         return super().list(request, *args, **kwargs)
 
+    @idempotent
     @extend_schema(
         summary="Create a new order",
         description=(
             "Creates a new order for the authenticated customer. "
-            "Requires a valid offer_detail_id in the request data."
+            "Requires a valid offer_detail_id in the request data. "
+            "Send an Idempotency-Key header to safely retry the request without placing a second order."
         ),
         tags=["Order"],
         responses={
@@ -68,7 +86,7 @@ class OrderViewSet(ModelViewSet):
             500: OpenApiResponse(description="Internal server error")
         }
     )
-    # Creates a new order for a customer user.
+    # Creates a new order for a customer user; retries with the same Idempotency-Key return the first order.
     def create(self, request, *args, **kwargs):
         user = request.user
         try:
@@ -76,12 +94,16 @@ class OrderViewSet(ModelViewSet):
             offer_detail_id = int(request.data.get("offer_detail_id"))
             offer_detail = OfferDetail.objects.get(id=offer_detail_id)
             business_profile = offer_detail.offer.user
-            order = Order.objects.create(
-                customer_user=customer_profile,
-                business_user=business_profile,
-                offer_detail=offer_detail,
-                status="in_progress"
-            )
+            with transaction.atomic():
+                order = Order.objects.create(
+                    customer_user=customer_profile,
+                    business_user=business_profile,
+                    offer_detail=offer_detail,
+                    status="in_progress",
+                    **get_offer_detail_terms(offer_detail)
+                )
+                record_order_created(order)
+                record_business_order_created(order)
             serializer = self.get_serializer(order)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         except OfferDetail.DoesNotExist:
@@ -97,37 +119,47 @@ class OrderViewSet(ModelViewSet):
         summary="Partially update an order's status",
         description=(
             "Updates the status of an order. Only the business user of the order is allowed to update. "
-            "Status must be one of the valid choices."
+            "An order in progress can be completed or cancelled; completed and cancelled orders are final. "
+            "Pass the `version` of the order as read to reject the change if the order was modified since."
         ),
         tags=["Order"],
         responses={
             200: OrderSerializer,
             400: OpenApiResponse(description="Invalid request data"),
             403: OpenApiResponse(description="You have no permission"),
+            409: OpenApiResponse(description="Order status cannot be changed or the order was modified"),
             500: OpenApiResponse(description="Internal server error")
         }
     )
     # Partially updates the status of an order (business user only).
+    # The change is one conditional UPDATE on the status and version that were read, so of two
+    # concurrent changes only the first succeeds and the second gets a 409.
     def partial_update(self, request, *args, **kwargs):
         order = self.get_object()
-        user = request.user
         try:
-            profile = Profile.objects.get(user=user)
-            if order.business_user != profile:
+            if order.business_user_id != request.profile.pk:
                 raise PermissionDenied()
-            allowed_status = [key for key in STATUS_CHOICE.keys()]
             new_status = request.data.get("status")
-            if not new_status or new_status not in allowed_status:
+            if not new_status or new_status not in STATUS_CHOICE:
                 raise ValidationError()
-            order.status = new_status
-            order.save()
+            expected_version = request.data.get("version")
+            if expected_version is not None and int(expected_version) != order.version:
+                return Response({"details": "The order was modified by another request"}, status=status.HTTP_409_CONFLICT)
+            if not can_transition(order.status, new_status):
+                return Response(
+                    {"details": f"Order status cannot change from {order.status} to {new_status}"},
+                    status=status.HTTP_409_CONFLICT)
+            previous_status = order.status
+            with transaction.atomic():
+                if not Order.objects.transition(order, new_status):
+                    return Response({"details": "The order was modified by another request"}, status=status.HTTP_409_CONFLICT)
+                record_order_status_change(order, previous_status)
+                record_business_order_status_change(order, previous_status)
             serializer = self.get_serializer(order)
             return Response(serializer.data, status=status.HTTP_200_OK)
-        except Profile.DoesNotExist:
-            return Response({"details": "Profile was not found."}, status=status.HTTP_401_UNAUTHORIZED)
         except PermissionDenied:
             return Response({"details": "You have no permission"}, status=status.HTTP_403_FORBIDDEN)
-        except ValidationError:
+        except (ValidationError, TypeError, ValueError):
             return Response({"details": "Invalid request data"}, status=status.HTTP_400_BAD_REQUEST)
         except Exception:
             return Response({"details": f"An Internal server error occured!"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -145,7 +177,10 @@ class OrderViewSet(ModelViewSet):
     # Deletes an order (admin only).
     def destroy(self, request, *args, **kwargs):
         order = self.get_object()
-        self.perform_destroy(order)
+        with transaction.atomic():
+            self.perform_destroy(order)
+            record_order_deleted(order)
+            record_business_order_deleted(order)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
@@ -174,12 +209,12 @@ class OrderCountView(APIView):
             500: OpenApiResponse(description="Internal server error")
         }
     )
-    # Returns the number of in-progress orders for a given business user profile.
+    # Returns the number of in-progress orders for a given business user profile from its counters.
     def get(self, request, business_user_id):
         try:
-            profile = Profile.objects.get(pk=business_user_id, type="business")
-            order_count = Order.objects.filter(business_user=profile, status="in_progress").count()
-            serializer = OrderCountSerializer({"order_count": order_count})
+            profile = Profile.objects.select_related("order_stats").get(pk=business_user_id, type="business")
+            stats = get_business_order_stats(profile)
+            serializer = OrderCountSerializer({"order_count": stats.in_progress_count})
             return Response(serializer.data, status=status.HTTP_200_OK)
         except Profile.DoesNotExist:
             return Response({"details": "No business user was found!"}, status=status.HTTP_404_NOT_FOUND)
@@ -212,14 +247,75 @@ class CompletedOrderView(APIView):
             500: OpenApiResponse(description="Internal server error")
         }
     )
-    # Returns the number of completed orders for a given business user profile.
+    # Returns the number of completed orders for a given business user profile from its counters.
     def get(self, request, business_user_id):
         try:
-            profile = Profile.objects.get(pk=business_user_id, type="business")
-            order_count = Order.objects.filter(business_user=profile, status="completed").count()
-            serializer = CompletedOrderSerializer({"completed_order_count": order_count})
+            profile = Profile.objects.select_related("order_stats").get(pk=business_user_id, type="business")
+            stats = get_business_order_stats(profile)
+            serializer = CompletedOrderSerializer({"completed_order_count": stats.completed_count})
             return Response(serializer.data, status=status.HTTP_200_OK)
         except Profile.DoesNotExist:
             return Response({"details": "No business user was found!"}, status=status.HTTP_404_NOT_FOUND)
         except Exception:
             return Response({"details": "An Internal server error occured!"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+# API view for retrieving the order counts of many business users in one request.
+class BusinessOrderCountsView(APIView):
+    permission_classes = [IsAuthenticated]
+    max_business_user_ids = 100
+
+    @extend_schema(
+        summary="Get order counts for many business users",
+        description=(
+            "Returns the number of 'in_progress' and 'completed' orders for each business user in the "
+            "comma separated `business_user_ids` list. Ids that are not business users are left out."
+        ),
+        tags=["Order"],
+        parameters=[
+            OpenApiParameter(
+                name="business_user_ids",
+                description="Comma separated primary keys of business user profiles",
+                required=True,
+                type=str,
+            ),
+        ],
+        responses={
+            200: BusinessOrderCountSerializer(many=True),
+            400: OpenApiResponse(description="Invalid business_user_ids"),
+            500: OpenApiResponse(description="Internal server error")
+        }
+    )
+    # Returns the counters of all requested business user profiles, read together with the profiles in one query.
+    def get(self, request):
+        try:
+            business_user_ids = self.get_business_user_ids(request.query_params)
+            profiles = Profile.objects.filter(pk__in=business_user_ids, type="business").select_related("order_stats")
+            positions = {pk: position for position, pk in enumerate(business_user_ids)}
+            counts = []
+            for profile in sorted(profiles, key=lambda profile: positions[profile.pk]):
+                stats = get_business_order_stats(profile)
+                counts.append({
+                    "business_user_id": profile.pk,
+                    "order_count": stats.in_progress_count,
+                    "completed_order_count": stats.completed_count,
+                })
+            serializer = BusinessOrderCountSerializer(counts, many=True)
+            return Response(serializer.data, status=status.HTTP_200_OK)
+        except ValidationError as error:
+            return Response({"details": error.detail[0]}, status=status.HTTP_400_BAD_REQUEST)
+        except Exception:
+            return Response({"details": "An Internal server error occured!"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    # Parses the requested profile ids, keeping their order and dropping duplicates.
+    def get_business_user_ids(self, params):
+        try:
+            business_user_ids = [int(value) for value in params.get("business_user_ids", "").split(",") if value.strip()]
+        except ValueError:
+            raise ValidationError("business_user_ids must be a comma separated list of integers")
+        business_user_ids = list(dict.fromkeys(business_user_ids))
+        if not business_user_ids:
+            raise ValidationError("business_user_ids is required")
+        if len(business_user_ids) > self.max_business_user_ids:
+            raise ValidationError(f"At most {self.max_business_user_ids} business_user_ids are allowed")
+        return business_user_ids
@@ -0,0 +1,78 @@
+from time import perf_counter
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from order_app.models import Order
+from user_auth_app.models import Profile
+
+
+# Management command measuring the order list query of one participant while the orders table grows.
+# Compares the former OR + DISTINCT filter with the UNION ALL lookup on rolled-back synthetic data.
+class Command(BaseCommand):
+    help = "Benchmarks the order visibility query for growing table sizes."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes", default="10000,100000,1000000",
+            help="Comma separated total numbers of orders to measure at.")
+        parser.add_argument("--repeat", type=int, default=5, help="Runs per query; the fastest one is reported.")
+        parser.add_argument("--user-orders", type=int, default=20, help="Orders of the measured user.")
+
+    def handle(self, *args, **options):
+        sizes = sorted(int(size) for size in options["sizes"].split(","))
+        with transaction.atomic():
+            user, customers, businesses = self.create_profiles()
+            self.create_orders(user.profiles.get(), businesses, options["user_orders"])
+            for size in sizes:
+                self.create_orders_until(size, customers, businesses)
+                legacy = self.measure(lambda: list(self.get_legacy_queryset(user)), options["repeat"])
+                union = self.measure(lambda: list(Order.objects.visible_to(user)), options["repeat"])
+                self.stdout.write(
+                    f"{Order.objects.count()} orders: OR + DISTINCT {legacy * 1000:.2f} ms, "
+                    f"UNION ALL {union * 1000:.2f} ms")
+            transaction.set_rollback(True)
+
+    # Returns the order list queryset as it was built before the UNION ALL rewrite.
+    def get_legacy_queryset(self, user):
+        profile = user.profiles.first()
+        return Order.objects.filter(Q(customer_user=profile) | Q(business_user=profile)).distinct()
+
+    # Creates the measured customer and pools of other customers and business users.
+    def create_profiles(self):
+        users = User.objects.bulk_create(User(username=f"benchmark-order-{index}") for index in range(201))
+        profiles = Profile.objects.bulk_create(
+            Profile(user=user, type="customer" if index <= 100 else "business", tel="0123456789")
+            for index, user in enumerate(users)
+        )
+        return users[0], profiles[1:101], profiles[101:]
+
+    # Inserts orders of the given customer with rotating business users.
+    def create_orders(self, customer, businesses, count):
+        Order.objects.bulk_create(
+            (Order(customer_user=customer, business_user=businesses[index % len(businesses)])
+             for index in range(count)),
+            batch_size=1000,
+        )
+
+    # Inserts orders between the other profiles until the table holds size rows.
+    def create_orders_until(self, size, customers, businesses):
+        missing = size - Order.objects.count()
+        Order.objects.bulk_create(
+            (Order(customer_user=customers[index % len(customers)],
+                   business_user=businesses[index % len(businesses)])
+             for index in range(max(missing, 0))),
+            batch_size=1000,
+        )
+
+    # Returns the fastest run time in seconds.
+    def measure(self, run, repeat):
+        best = None
+        for _ in range(repeat):
+            start = perf_counter()
+            run()
+            elapsed = perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best
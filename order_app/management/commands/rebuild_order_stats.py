@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from order_app.stats import rebuild_business_order_stats
+
+
+# Management command rebuilding the per business order counters, e.g. after orders were changed outside the API.
+class Command(BaseCommand):
+    help = "Rebuilds the in_progress, completed and cancelled order counters of all business users from the orders."
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            rebuilt = rebuild_business_order_stats()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt order counters of {rebuilt} business users."))
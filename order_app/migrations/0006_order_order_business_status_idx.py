@@ -0,0 +1,19 @@
+# Generated by Django 5.2.1 on 2026-10-17 06:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('offer_app', '0004_offer_offer_user_updated_idx_offer_offer_updated_idx_and_more'),
+        ('order_app', '0005_alter_order_status'),
+        ('user_auth_app', '0014_alter_profile_description_alter_profile_location'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['business_user', 'status'], name='order_business_status_idx'),
+        ),
+    ]
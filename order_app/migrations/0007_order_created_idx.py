@@ -0,0 +1,19 @@
+# Generated by Django 5.2.1 on 2026-10-17 07:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('offer_app', '0008_offer_order_counts'),
+        ('order_app', '0006_order_order_business_status_idx'),
+        ('user_auth_app', '0016_profile_location_grid'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['created_at', 'id'], name='order_created_idx'),
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.1 on 2026-10-17 07:35
+
+from django.db import migrations, models
+
+
+# Copies the current terms of the offer detail onto every existing order.
+def snapshot_offer_terms(apps, schema_editor):
+    Order = apps.get_model("order_app", "Order")
+    orders = list(Order.objects.filter(offer_detail__isnull=False).select_related("offer_detail")
+                  .prefetch_related("offer_detail__features"))
+    for order in orders:
+        detail = order.offer_detail
+        order.title = detail.title
+        order.revisions = detail.revisions
+        order.delivery_time_in_days = detail.delivery_time_in_days
+        order.price = detail.price
+        order.features = sorted(feature.title for feature in detail.features.all())
+        order.offer_type = detail.offer_type
+    Order.objects.bulk_update(
+        orders, ["title", "revisions", "delivery_time_in_days", "price", "features", "offer_type"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('offer_app', '0008_offer_order_counts'),
+        ('order_app', '0007_order_created_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='delivery_time_in_days',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='features',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='offer_type',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='price',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='revisions',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='title',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.RunPython(snapshot_offer_terms, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.1 on 2026-10-17 07:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+# Counts the existing orders of every business user by status.
+def count_business_orders(apps, schema_editor):
+    Order = apps.get_model("order_app", "Order")
+    BusinessOrderStats = apps.get_model("order_app", "BusinessOrderStats")
+    stats = {}
+    for row in Order.objects.order_by().values("business_user", "status").annotate(count=Count("pk")):
+        if row["status"] in ("in_progress", "completed", "cancelled"):
+            entry = stats.setdefault(row["business_user"], BusinessOrderStats(business_user_id=row["business_user"]))
+            setattr(entry, f"{row['status']}_count", row["count"])
+    BusinessOrderStats.objects.bulk_create(stats.values(), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('order_app', '0008_order_offer_terms'),
+        ('user_auth_app', '0016_profile_location_grid'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BusinessOrderStats',
+            fields=[
+                ('business_user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='order_stats', serialize=False, to='user_auth_app.profile')),
+                ('in_progress_count', models.IntegerField(default=0)),
+                ('completed_count', models.IntegerField(default=0)),
+                ('cancelled_count', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Business order stats',
+                'verbose_name_plural': 'Business order stats',
+            },
+        ),
+        migrations.RunPython(count_business_orders, migrations.RunPython.noop),
+    ]
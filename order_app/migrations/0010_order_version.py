@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-17 07:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('order_app', '0009_business_order_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='version',
+            field=models.IntegerField(default=0),
+        ),
+    ]
@@ -1,4 +1,6 @@
 from django.db import models
+from django.db.models import F
+from django.utils import timezone
 
 from offer_app.models import Offer, OfferDetail
 from user_auth_app.models import Profile
@@ -11,8 +13,58 @@ STATUS_CHOICE = {
     "cancelled": "Cancelled"
 }
 
+# Status changes a business user may make; completed and cancelled orders are final.
+STATUS_TRANSITIONS = {
+    "in_progress": ["completed", "cancelled"],
+    "completed": [],
+    "cancelled": [],
+}
+
+
+# Checks whether an order may move from one status to another.
+def can_transition(current_status, new_status):
+    return new_status in STATUS_TRANSITIONS.get(current_status, [])
+
+
+# Returns the terms of an offer detail that an order keeps as its own copy.
+def get_offer_detail_terms(offer_detail):
+    return {
+        "title": offer_detail.title,
+        "revisions": offer_detail.revisions,
+        "delivery_time_in_days": offer_detail.delivery_time_in_days,
+        "price": offer_detail.price,
+        "features": list(offer_detail.features.values_list("title", flat=True)),
+        "offer_type": offer_detail.offer_type,
+    }
+
+
+# QuerySet for orders with participant lookups.
+class OrderQuerySet(models.QuerySet):
+
+    # Orders in which the user takes part as customer or business user.
+    # Two indexed lookups combined with UNION ALL replace an OR filter with DISTINCT.
+    def visible_to(self, user):
+        as_customer = Order.objects.filter(customer_user__user=user).order_by().values("pk")
+        as_business = Order.objects.filter(business_user__user=user).order_by().values("pk")
+        return self.filter(pk__in=as_customer.union(as_business, all=True))
+
+    # Moves an order to a new status with one conditional UPDATE that only matches while the row still has
+    # the business user, status and version the caller read. Updates the instance and returns True on success,
+    # or returns False when another request changed the order in between.
+    def transition(self, order, new_status):
+        updated_at = timezone.now()
+        updated = self.filter(
+            pk=order.pk, business_user_id=order.business_user_id, status=order.status, version=order.version,
+        ).update(status=new_status, version=F("version") + 1, updated_at=updated_at)
+        if not updated:
+            return False
+        order.status, order.version, order.updated_at = new_status, order.version + 1, updated_at
+        return True
+
 
 # Model representing an order between a customer and a business user.
+# The offer detail terms are copied onto the order when it is placed, so later edits of the offer
+# do not change what was ordered and the order list reads from this table alone.
 class Order(models.Model):
     customer_user = models.ForeignKey(Profile, on_delete=models.CASCADE, related_name="orders_as_customer")
     business_user = models.ForeignKey(Profile, on_delete=models.CASCADE, related_name="orders_as_business")
@@ -20,12 +72,41 @@ class Order(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     offer_detail = models.ForeignKey(OfferDetail, on_delete=models.CASCADE, null=True, blank=True, related_name="orders")
     status = models.CharField(max_length=255, choices=STATUS_CHOICE, default="in_progress")
+    version = models.IntegerField(default=0)
+    title = models.CharField(max_length=255, blank=True, default="")
+    revisions = models.IntegerField(null=True, blank=True)
+    delivery_time_in_days = models.IntegerField(null=True, blank=True)
+    price = models.IntegerField(null=True, blank=True)
+    features = models.JSONField(default=list, blank=True)
+    offer_type = models.CharField(max_length=255, blank=True, default="")
+
+    objects = OrderQuerySet.as_manager()
 
     class Meta:
         verbose_name = "Order"
         verbose_name_plural = "Orders"
         ordering = ["customer_user"]
+        indexes = [
+            models.Index(fields=["business_user", "status"], name="order_business_status_idx"),
+            models.Index(fields=["created_at", "id"], name="order_created_idx"),
+        ]
 
     # Returns the username of the customer for display purposes.
     def __str__(self):
         return self.customer_user.user.username
+
+
+# Per business user counters of orders by status, kept up to date by order_app.stats.
+class BusinessOrderStats(models.Model):
+    business_user = models.OneToOneField(
+        Profile, on_delete=models.CASCADE, primary_key=True, related_name="order_stats")
+    in_progress_count = models.IntegerField(default=0)
+    completed_count = models.IntegerField(default=0)
+    cancelled_count = models.IntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Business order stats"
+        verbose_name_plural = "Business order stats"
+
+    def __str__(self):
+        return self.business_user.user.username
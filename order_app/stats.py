@@ -0,0 +1,56 @@
+from django.db.models import Count, F
+
+from order_app.models import STATUS_CHOICE, BusinessOrderStats, Order
+
+
+# Returns the counter field of an order status.
+def get_count_field(status):
+    return f"{status}_count"
+
+
+# Adds delta to the counters of a business user with F() expressions, creating the row on first use.
+def add_business_orders(business_user_id, deltas):
+    values = {get_count_field(status): F(get_count_field(status)) + delta for status, delta in deltas.items() if delta}
+    if not values:
+        return
+    BusinessOrderStats.objects.get_or_create(business_user_id=business_user_id)
+    BusinessOrderStats.objects.filter(business_user_id=business_user_id).update(**values)
+
+
+# Counts a newly placed order.
+def record_business_order_created(order):
+    add_business_orders(order.business_user_id, {order.status: 1})
+
+
+# Moves an order from the counter of its previous status to the one of its current status.
+def record_business_order_status_change(order, previous_status):
+    if order.status != previous_status:
+        add_business_orders(order.business_user_id, {previous_status: -1, order.status: 1})
+
+
+# Removes a deleted order from the counters.
+def record_business_order_deleted(order):
+    add_business_orders(order.business_user_id, {order.status: -1})
+
+
+# Returns the counters of a business profile, or unsaved zero counters if it never had an order.
+# Load the profile with select_related("order_stats") to avoid a second query.
+def get_business_order_stats(profile):
+    try:
+        return profile.order_stats
+    except BusinessOrderStats.DoesNotExist:
+        return BusinessOrderStats(business_user=profile)
+
+
+# Rebuilds the counters of all business users from the orders in one grouped query.
+# Returns the number of business users with orders.
+def rebuild_business_order_stats():
+    rows = Order.objects.order_by().values("business_user", "status").annotate(count=Count("pk"))
+    stats = {}
+    for row in rows:
+        if row["status"] in STATUS_CHOICE:
+            entry = stats.setdefault(row["business_user"], BusinessOrderStats(business_user_id=row["business_user"]))
+            setattr(entry, get_count_field(row["status"]), row["count"])
+    BusinessOrderStats.objects.all().delete()
+    BusinessOrderStats.objects.bulk_create(stats.values(), batch_size=500)
+    return len(stats)
@@ -5,6 +5,7 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
 
+from core.idempotency import idempotent
 from order_app.api.permissions import IsCustomerUser
 from user_auth_app.models import Profile
 from review_app.models import Review
@@ -46,9 +47,10 @@ class ReviewViewSet(ModelViewSet):
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
     
+    @idempotent
     @extend_schema(
         summary="Create a new review",
-        description="Creates a new review for a specific business user by a customer. Only one review per customer/business pair is allowed.",
+        description="Creates a new review for a specific business user by a customer. Only one review per customer/business pair is allowed. Send an Idempotency-Key header to safely retry the request.",
         tags=["Review"],
         responses={
             201: ReviewSerializer,
@@ -59,7 +61,7 @@ class ReviewViewSet(ModelViewSet):
             500: OpenApiResponse(description="An internal server error occurred!"),
         }
     )
-    # Creates a new review for a business user.
+    # Creates a new review for a business user; retries with the same Idempotency-Key return the first review.
     def create(self, request, *args, **kwargs):
         data = request.data
         business_user_id = data.get("business_user")
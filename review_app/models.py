@@ -17,6 +17,10 @@ class Review(models.Model):
         verbose_name = "Review"
         verbose_name_plural = "Reviews"
         ordering = ["pk"]
+        indexes = [
+            models.Index(fields=["business_user", "updated_at"], name="review_business_updated_idx"),
+            models.Index(fields=["business_user", "rating"], name="review_business_rating_idx"),
+        ]
 
     def __str__(self):
         return self.description
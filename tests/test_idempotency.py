@@ -0,0 +1,105 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+from order_app.models import Order
+from review_app.models import Review
+from tests.test_offer import create_business_offers
+from user_auth_app.models import IdempotencyKey, Profile
+
+
+# Test class for Idempotency-Key handling of order and review creation
+class TestIdempotencyKeys(APITestCase):
+
+    def setUp(self):
+        self.business_user, self.business, offers = create_business_offers("idempotentBusiness", 1)
+        self.detail = offers[0].details.first()
+        self.customer_user = User.objects.create_user(username="idempotentCustomer", password="Hallo123@")
+        Profile.objects.create(type="customer", user=self.customer_user)
+        token, created = Token.objects.get_or_create(user=self.customer_user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+
+    # Helper method placing an order with the given Idempotency-Key
+    def place_order(self, key, offer_detail_id=None):
+        data = {"offer_detail_id": offer_detail_id or self.detail.id}
+        return self.client.post(reverse("orders-list"), data, format="json", HTTP_IDEMPOTENCY_KEY=key)
+
+    # Test a retried order returns the first order without creating another one
+    def test_order_retry_is_replayed(self):
+        first = self.place_order("order-1")
+        retry = self.place_order("order-1")
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.data["id"], first.data["id"])
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertEqual(Order.objects.count(), 1)
+
+    # Test different keys and requests without a key still create separate orders
+    def test_distinct_keys_create_orders(self):
+        self.place_order("order-1")
+        self.place_order("order-2")
+        self.client.post(reverse("orders-list"), {"offer_detail_id": self.detail.id}, format="json")
+        self.assertEqual(Order.objects.count(), 3)
+
+    # Test reusing a key with another payload is rejected
+    def test_key_reused_with_other_payload(self):
+        self.place_order("order-1")
+        other_detail = self.detail.offer.details.exclude(pk=self.detail.pk).first()
+        response = self.place_order("order-1", other_detail.id)
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(Order.objects.count(), 1)
+
+    # Test a retry while the first request still holds the key gets a conflict
+    def test_key_in_progress(self):
+        IdempotencyKey.objects.create(user=self.customer_user, key="order-1", fingerprint="running")
+        response = self.place_order("order-1")
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(Order.objects.count(), 0)
+
+    # Test a key abandoned by a stopped request is taken over after the lock timeout
+    def test_stale_claim_is_taken_over(self):
+        IdempotencyKey.objects.create(
+            user=self.customer_user, key="order-1", fingerprint="stopped",
+            created_at=timezone.now() - timedelta(minutes=5))
+        response = self.place_order("order-1")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(IdempotencyKey.objects.get(key="order-1").status_code, status.HTTP_201_CREATED)
+
+    # Test keys are scoped per user
+    def test_keys_are_scoped_per_user(self):
+        self.place_order("order-1")
+        other_user = User.objects.create_user(username="otherIdempotent", password="Hallo123@")
+        Profile.objects.create(type="customer", user=other_user)
+        token, created = Token.objects.get_or_create(user=other_user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+        response = self.place_order("order-1")
+        self.assertNotIn("Idempotent-Replayed", response)
+        self.assertEqual(Order.objects.count(), 2)
+
+    # Test expired keys are purged, so a late retry runs the view again
+    def test_expired_keys_are_purged(self):
+        self.place_order("order-1")
+        IdempotencyKey.objects.update(created_at=timezone.now() - timedelta(days=2))
+        response = self.place_order("order-1")
+        self.assertNotIn("Idempotent-Replayed", response)
+        self.assertEqual(Order.objects.count(), 2)
+        IdempotencyKey.objects.update(created_at=timezone.now() - timedelta(days=2))
+        call_command("purge_idempotency_keys", stdout=StringIO())
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+    # Test a retried review returns the stored review instead of the duplicate review error
+    def test_review_retry_is_replayed(self):
+        data = {"business_user": self.business.id, "rating": 4, "description": "Great"}
+        first = self.client.post(reverse("reviews-list"), data, format="json", HTTP_IDEMPOTENCY_KEY="review-1")
+        retry = self.client.post(reverse("reviews-list"), data, format="json", HTTP_IDEMPOTENCY_KEY="review-1")
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.data["id"], first.data["id"])
+        self.assertEqual(Review.objects.count(), 1)
@@ -0,0 +1,120 @@
+from io import BytesIO
+import shutil
+import tempfile
+from unittest import skipUnless
+
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+from core.images import get_variant_path, process_image
+from offer_app.models import Offer, OfferCard
+from user_auth_app.api.serializers import ProfileSerializer
+from user_auth_app.models import Profile, ProfileFile
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+
+# Creates PNG bytes of the given size and color.
+def create_png(size=(800, 600), color="red"):
+    output = BytesIO()
+    Image.new("RGB", size, color).save(output, format="PNG")
+    return output.getvalue()
+
+
+# Test class for the background image variant pipeline
+@skipUnless(Image, "Pillow is not installed")
+class TestImagePipeline(APITestCase):
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        self.user = User.objects.create_user(
+            username="exampleUsername", email="example@test.de", password="Hallo123@")
+        self.profile = Profile.objects.create(type="business", user=self.user)
+        self.token, created = Token.objects.get_or_create(user=self.user)
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    # Helper method creating an offer with an uploaded image
+    def create_offer(self, content):
+        offer = Offer(user=self.profile, title="Logo", description="Logo", min_price=100, min_delivery_time=3)
+        offer.image.save("logo.png", ContentFile(content), save=False)
+        offer.save()
+        return offer
+
+    # Test saving an image schedules the pipeline after commit
+    def test_schedule_on_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.create_offer(create_png())
+        self.assertIn("schedule_image_processing", [callback.__qualname__.split(".")[0] for callback in callbacks])
+
+    # Test saves that keep the file do not schedule the pipeline again, while replacing it does
+    def test_schedule_only_on_file_change(self):
+        offer = Offer.objects.get(pk=self.create_offer(create_png()).pk)
+        offer.description = "Changed"
+        with self.captureOnCommitCallbacks() as callbacks:
+            offer.save()
+        self.assertNotIn("schedule_image_processing", [callback.__qualname__.split(".")[0] for callback in callbacks])
+        offer.image.save("other.png", ContentFile(create_png(color="green")), save=False)
+        with self.captureOnCommitCallbacks() as callbacks:
+            offer.save()
+        self.assertIn("schedule_image_processing", [callback.__qualname__.split(".")[0] for callback in callbacks])
+
+    # Test processing stores WebP variants and exposes their URLs
+    def test_process_offer_image(self):
+        offer = self.create_offer(create_png())
+        process_image("offer_app.Offer", offer.pk, "image", "image_hash")
+        offer.refresh_from_db()
+        self.assertEqual(len(offer.image_hash), 64)
+        self.assertEqual(OfferCard.objects.get(offer=offer).image_hash, offer.image_hash)
+        with Image.open(default_storage.open(get_variant_path(offer.image_hash, "thumbnail"))) as thumbnail:
+            self.assertEqual((thumbnail.format, thumbnail.size), ("WEBP", (200, 200)))
+        response = self.client.get(reverse("offers-list"), format="json")
+        variants = response.data["results"][0]["image_variants"]
+        self.assertTrue(variants["card"].endswith(get_variant_path(offer.image_hash, "card")))
+
+    # Test identical uploads share their variants
+    def test_identical_uploads_are_deduplicated(self):
+        content = create_png(color="blue")
+        first = self.create_offer(content)
+        second = self.create_offer(content)
+        process_image("offer_app.Offer", first.pk, "image", "image_hash")
+        process_image("offer_app.Offer", second.pk, "image", "image_hash")
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(first.image_hash, second.image_hash)
+        _, files = default_storage.listdir(f"variants/{first.image_hash[:2]}/{first.image_hash}")
+        self.assertEqual(sorted(files), ["card.webp", "thumbnail.webp"])
+
+    # Test profile files get variants exposed on the profile
+    def test_process_profile_file(self):
+        profile_file = ProfileFile()
+        profile_file.file.save("me.png", ContentFile(create_png()), save=False)
+        profile_file.save()
+        self.profile.file = profile_file
+        self.profile.save()
+        process_image("user_auth_app.ProfileFile", profile_file.pk, "file", "file_hash")
+        profile_file.refresh_from_db()
+        self.assertEqual(len(profile_file.file_hash), 64)
+        self.assertEqual(
+            ProfileSerializer(self.profile).data["file_variants"]["thumbnail"],
+            default_storage.url(get_variant_path(profile_file.file_hash, "thumbnail")))
+
+    # Test invalid images are skipped without variants
+    def test_invalid_image(self):
+        offer = self.create_offer(b"not an image")
+        with self.assertLogs("core.images", level="ERROR"):
+            process_image("offer_app.Offer", offer.pk, "image", "image_hash")
+        offer.refresh_from_db()
+        self.assertEqual(offer.image_hash, "")
@@ -0,0 +1,36 @@
+from django.test import SimpleTestCase
+from django.urls import reverse
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from core.links import LinkBuilder, get_link_builder, get_route_template
+
+
+# Test class for the per-request link builder
+class TestLinkBuilder(SimpleTestCase):
+
+    def setUp(self):
+        self.request = Request(APIRequestFactory().get("/api/offers/1/", HTTP_HOST="example.com"))
+
+    # Test route links match reverse() joined to the request origin
+    def test_route(self):
+        links = LinkBuilder(self.request)
+        self.assertEqual(links.route("offerdetail", 7), "http://example.com" + reverse("offerdetail", args=[7]))
+        self.assertEqual(links.routes("offerdetail", [1, 2]), [
+            self.request.build_absolute_uri(reverse("offerdetail", args=[pk])) for pk in [1, 2]])
+
+    # Test absolute URLs match build_absolute_uri for root-relative, relative and full URLs
+    def test_absolute(self):
+        links = LinkBuilder(self.request)
+        for url in ["/media/a.png", "media/a.png", "https://cdn.example.com/a.png", "//cdn.example.com/a.png"]:
+            self.assertEqual(links.absolute(url), self.request.build_absolute_uri(url))
+
+    # Test links stay relative without a request
+    def test_without_request(self):
+        self.assertEqual(get_link_builder().route("offerdetail", 3), reverse("offerdetail", args=[3]))
+        self.assertEqual(get_link_builder().absolute("media/a.png"), "media/a.png")
+
+    # Test builders and route templates are reused
+    def test_reuse(self):
+        self.assertIs(get_link_builder(self.request), get_link_builder(self.request))
+        self.assertIs(get_route_template("offerdetail"), get_route_template("offerdetail"))
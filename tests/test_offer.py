@@ -1,6 +1,27 @@
+from datetime import timedelta
+from io import StringIO
+import json
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework import status
+from rest_framework.authtoken.models import Token
 from rest_framework.test import APITestCase
+from rest_framework.utils.encoders import JSONEncoder
+
+from offer_app.features import bump_feature_generation, feature_id_cache, resolve_feature_ids
+from offer_app.suggest import suggestion_index
+from offer_app.api.serializers import OfferSerializer
+from offer_app.models import Feature, Offer, OfferCard, OfferCatalog, OfferDetail
+from order_app.models import Order
+from user_auth_app.models import Profile
 
 
 # Test class for offers (Offer)
@@ -10,4 +31,780 @@ class TestOffer(APITestCase):
     def get_offer_creator_id(self):
         url = reverse("offers", args=[])
         response = self.client.get(url, format="json")
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
\ No newline at end of file
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+# Creates a business profile with the given number of offers.
+def create_business_offers(username, count):
+    user = User.objects.create_user(
+        username=username, email=f"{username}@test.de", password="Hallo123@")
+    profile = Profile.objects.create(type="business", user=user)
+    offers = []
+    for index in range(count):
+        offer = Offer.objects.create(
+            user=profile, title=f"Offer {index}", description="Test Description",
+            min_price=100 + (index % 3) * 10, min_delivery_time=3)
+        for offer_type in ["basic", "standard", "premium"]:
+            OfferDetail.objects.create(
+                offer=offer, title=f"{offer_type} {index}", revisions=1,
+                delivery_time_in_days=3, price=offer.min_price, offer_type=offer_type)
+        offers.append(offer)
+    return user, profile, offers
+
+
+# Test class for keyset (cursor) pagination of the offer list
+class TestOfferCursorPagination(APITestCase):
+
+    def setUp(self):
+        self.user, self.profile, self.offers = create_business_offers("cursorUser", 7)
+
+    # Helper method to follow next links until the last page
+    def collect_pages(self, url):
+        ids = []
+        while url:
+            response = self.client.get(url, format="json")
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            ids.extend(offer["id"] for offer in response.data["results"])
+            url = response.data["next"]
+        return ids
+
+    # Test walking all pages returns every offer once in keyset order
+    def test_cursor_pages_cover_all_offers(self):
+        url = reverse("offers-list") + "?pagination=cursor&page_size=3&ordering=-min_price"
+        ids = self.collect_pages(url)
+        expected = list(Offer.objects.order_by("-min_price", "-pk").values_list("pk", flat=True))
+        self.assertEqual(ids, expected)
+
+    # Test the previous link returns the preceding page
+    def test_cursor_previous_link(self):
+        url = reverse("offers-list") + "?pagination=cursor&page_size=3"
+        first = self.client.get(url, format="json").data
+        second = self.client.get(first["next"], format="json").data
+        previous = self.client.get(second["previous"], format="json").data
+        self.assertIsNone(first["previous"])
+        self.assertEqual(previous["results"], first["results"])
+        self.assertIsNone(previous["previous"])
+
+    # Test cursor mode keeps the envelope without counting rows
+    def test_cursor_envelope(self):
+        url = reverse("offers-list") + "?pagination=cursor"
+        response = self.client.get(url, format="json")
+        self.assertEqual(set(response.data.keys()), {"count", "next", "previous", "results"})
+        self.assertIsNone(response.data["count"])
+
+    # Test an invalid cursor is rejected
+    def test_invalid_cursor(self):
+        url = reverse("offers-list") + "?cursor=invalid"
+        response = self.client.get(url, format="json")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    # Test page-number pagination stays the default
+    def test_page_number_default(self):
+        url = reverse("offers-list") + "?page_size=3&page=2"
+        response = self.client.get(url, format="json")
+        self.assertEqual(response.data["count"], 7)
+        self.assertEqual(len(response.data["results"]), 3)
+
+
+# Test class for full-text search over offer titles and descriptions
+class TestOfferSearch(APITestCase):
+
+    def setUp(self):
+        self.user, self.profile, self.offers = create_business_offers("searchUser", 3)
+        self.offers[0].title = "Website Development"
+        self.offers[0].description = "A modern logo for your website"
+        self.offers[0].save()
+        self.offers[1].title = "Logo Design"
+        self.offers[1].description = "Logo design with unlimited logo revisions"
+        self.offers[1].save()
+
+    # Helper method to search offers and return the result IDs
+    def search(self, term, extra=""):
+        url = reverse("offers-list") + f"?search={term}{extra}"
+        response = self.client.get(url, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [offer["id"] for offer in response.data["results"]]
+
+    # Test search results are ranked by relevance
+    def test_search_ranks_matches(self):
+        self.assertEqual(self.search("logo"), [self.offers[1].id, self.offers[0].id])
+
+    # Test search terms match as prefixes and must all be present
+    def test_search_prefix_and_terms(self):
+        self.assertEqual(self.search("webs"), [self.offers[0].id])
+        self.assertEqual(self.search("logo unlimited"), [self.offers[1].id])
+
+    # Test the index follows updates and deletions of offers
+    def test_search_index_in_sync(self):
+        self.offers[2].title = "Illustration"
+        self.offers[2].save()
+        self.assertEqual(self.search("illustration"), [self.offers[2].id])
+        self.offers[2].delete()
+        self.assertEqual(self.search("illustration"), [])
+
+    # Test an explicit ordering overrides the relevance ranking
+    def test_search_with_ordering(self):
+        ids = self.search("logo", "&ordering=updated_at")
+        self.assertEqual(ids, [self.offers[0].id, self.offers[1].id])
+
+    # Test search input with quotes is escaped
+    def test_search_with_quotes(self):
+        self.assertEqual(self.search('"logo'), [self.offers[1].id, self.offers[0].id])
+
+
+# Test class for creating offers
+class TestCreateOffer(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="exampleUsername", email="example@test.de", password="Hallo123@")
+        self.profile = Profile.objects.create(type="business", user=self.user)
+        self.token, created = Token.objects.get_or_create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        Feature.objects.create(title="Feature 0")
+        feature_id_cache.clear()
+
+    # Helper method to build an offer payload with three details
+    def get_offer_data(self, feature_count=10):
+        features = [f"Feature {index}" for index in range(feature_count)]
+        return {
+            "title": "Grafikdesign-Paket",
+            "image": None,
+            "description": "Ein umfassendes Grafikdesign-Paket für Unternehmen.",
+            "details": [
+                {"title": f"{offer_type} Design", "revisions": index + 1, "delivery_time_in_days": 7 - index,
+                 "price": 100 * (index + 1), "features": features, "offer_type": offer_type}
+                for index, offer_type in enumerate(["basic", "standard", "premium"])
+            ],
+        }
+
+    # Test creating an offer stores the details, features and minimum values
+    def test_create_offer(self):
+        response = self.client.post(reverse("offers-list"), self.get_offer_data(), format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        offer = Offer.objects.get(pk=response.data["id"])
+        self.assertEqual((offer.min_price, offer.min_delivery_time), (100, 5))
+        self.assertEqual(offer.details.count(), 3)
+        self.assertEqual(Feature.objects.count(), 10)
+        for detail in response.data["details"]:
+            self.assertEqual(len(detail["features"]), 10)
+
+    # Test creating an offer stays within a fixed query budget
+    def test_create_offer_query_budget(self):
+        with self.assertNumQueries(15):
+            response = self.client.post(reverse("offers-list"), self.get_offer_data(), format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    # Test a failing detail rolls back the whole offer
+    def test_create_offer_is_atomic(self):
+        data = self.get_offer_data()
+        data["details"][2]["title"] = None
+        response = self.client.post(reverse("offers-list"), data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_500_INTERNAL_SERVER_ERROR)
+        self.assertFalse(Offer.objects.exists())
+        self.assertEqual(Feature.objects.count(), 1)
+
+    # Test a customer cannot create an offer
+    def test_create_offer_as_customer(self):
+        self.profile.type = "customer"
+        self.profile.save()
+        response = self.client.post(reverse("offers-list"), self.get_offer_data(), format="json")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+# Test class for the unique feature catalog and its title to id cache
+class TestFeatureCatalog(APITestCase):
+
+    def setUp(self):
+        self.feature = Feature.objects.create(title="Logo Design")
+        feature_id_cache.clear()
+
+    # Test feature titles are unique
+    def test_feature_title_unique(self):
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Feature.objects.create(title="Logo Design")
+
+    # Test resolving titles reuses existing features and inserts missing ones
+    def test_resolve_feature_ids(self):
+        feature_ids = resolve_feature_ids(["Logo Design", "Flyer", "Flyer"])
+        self.assertEqual(feature_ids["Logo Design"], self.feature.id)
+        self.assertEqual(Feature.objects.get(title="Flyer").id, feature_ids["Flyer"])
+        self.assertEqual(Feature.objects.count(), 2)
+
+    # Test cached titles are resolved with only the feature generation read
+    def test_resolve_feature_ids_cached(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            resolve_feature_ids(["Logo Design"])
+        with self.assertNumQueries(1):
+            feature_ids = resolve_feature_ids(["Logo Design"])
+        self.assertEqual(feature_ids, {"Logo Design": self.feature.id})
+
+    # Test a feature renamed by another worker is not served from this worker's cache
+    def test_other_worker_rename_invalidates_cache(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            resolve_feature_ids(["Logo Design"])
+        old_id = self.feature.id
+        Feature.objects.filter(pk=old_id).update(title="Logo")
+        bump_feature_generation()
+        feature_ids = resolve_feature_ids(["Logo Design"])
+        self.assertNotEqual(feature_ids["Logo Design"], old_id)
+        self.assertEqual(Feature.objects.get(title="Logo Design").id, feature_ids["Logo Design"])
+
+    # Test renaming a feature invalidates its cache entry
+    def test_rename_invalidates_cache(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            resolve_feature_ids(["Logo Design"])
+        self.feature.title = "Logo"
+        self.feature.save()
+        self.assertEqual(feature_id_cache.get_many(["Logo Design"]), {})
+
+    # Test the cache evicts the least recently used titles
+    def test_cache_is_bounded(self):
+        cache = type(feature_id_cache)(maxsize=2)
+        cache.set_many({"a": 1, "b": 2})
+        cache.get_many(["a"])
+        cache.set_many({"c": 3})
+        self.assertEqual(cache.get_many(["a", "b", "c"]), {"a": 1, "c": 3})
+
+
+# Test class checking offer endpoints run a constant number of queries
+class TestOfferQueryCount(APITestCase):
+
+    def setUp(self):
+        self.user, self.profile, self.offers = create_business_offers("queryUser", 2)
+        self.token, created = Token.objects.get_or_create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        features = [Feature.objects.create(title=f"Feature {index}") for index in range(3)]
+        for detail in OfferDetail.objects.all():
+            detail.features.set(features)
+
+    # Helper method counting the queries of a GET request
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(context.captured_queries)
+
+    # Helper method adding more offers with linked features
+    def add_offers(self, count):
+        user, profile, offers = create_business_offers("queryUserOther", count)
+        feature = Feature.objects.first()
+        for detail in OfferDetail.objects.filter(offer__in=offers):
+            detail.features.add(feature)
+
+    # Test the offer list query count does not grow with the number of results
+    def test_offer_list_constant_query_count(self):
+        url = reverse("offers-list") + "?page_size=20"
+        before = self.count_queries(url)
+        self.add_offers(3)
+        self.assertEqual(self.count_queries(url), before)
+
+    # Test retrieving an offer detail loads its features with one query
+    def test_offer_detail_retrieve(self):
+        detail = OfferDetail.objects.first()
+        url = reverse("offerdetail", args=[detail.id])
+        with self.assertNumQueries(4):
+            response = self.client.get(url, format="json")
+        self.assertEqual(response.data["features"], ["Feature 0", "Feature 1", "Feature 2"])
+
+
+# Test class for the cached offer list
+class TestOfferListCache(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user, self.profile, self.offers = create_business_offers("cacheUser", 3)
+        self.url = reverse("offers-list") + "?ordering=min_price&page_size=10"
+
+    # Test an identical request is served with only the shared generation lookup
+    def test_list_served_from_cache(self):
+        first = self.client.get(self.url, format="json")
+        with self.assertNumQueries(1):
+            second = self.client.get(self.url, format="json")
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.data, first.data)
+
+    # Test equivalent query strings share one cache entry
+    def test_list_cache_key_normalized(self):
+        self.client.get(self.url, format="json")
+        with self.assertNumQueries(1):
+            self.client.get(reverse("offers-list") + "?page_size=10&ordering=min_price&unused=1", format="json")
+
+    # Test writes to offers, details and owners invalidate the cached list
+    def test_list_cache_invalidated_on_write(self):
+        self.client.get(self.url, format="json")
+        self.offers[0].title = "Changed Title"
+        self.offers[0].save()
+        response = self.client.get(self.url, format="json")
+        self.assertIn("Changed Title", [offer["title"] for offer in response.data["results"]])
+
+        detail = self.offers[0].details.first()
+        detail.delete()
+        response = self.client.get(self.url, format="json")
+        details = next(offer["details"] for offer in response.data["results"] if offer["id"] == self.offers[0].id)
+        self.assertNotIn(detail.id, [item["id"] for item in details])
+
+        self.user.first_name = "Changed"
+        self.user.save()
+        response = self.client.get(self.url, format="json")
+        self.assertEqual(response.data["results"][0]["user_details"]["first_name"], "Changed")
+
+    # Test a generation bumped by another worker invalidates the pages cached by this one
+    def test_list_cache_generation_is_shared(self):
+        self.client.get(self.url, format="json")
+        OfferCard.objects.filter(offer=self.offers[0]).update(title="Changed Elsewhere")
+        OfferCatalog.objects.update(generation=F("generation") + 1)
+        response = self.client.get(self.url, format="json")
+        self.assertIn("Changed Elsewhere", [offer["title"] for offer in response.data["results"]])
+
+    # Test saves of customers and of unrelated user fields leave the cards and cached lists alone
+    def test_unrelated_owner_saves_keep_cache(self):
+        customer = User.objects.create_user(username="cacheCustomer", password="Hallo123@")
+        customer_profile = Profile.objects.create(type="customer", user=customer)
+        self.client.get(self.url, format="json")
+        with CaptureQueriesContext(connection) as queries:
+            self.user.last_login = timezone.now()
+            self.user.save(update_fields=["last_login"])
+            customer.first_name = "Customer"
+            customer.save()
+            customer_profile.location = "Berlin"
+            customer_profile.save()
+            self.profile.description = "Changed"
+            self.profile.save(update_fields=["description"])
+        self.assertFalse([query for query in queries if "offer_app_offercard" in query["sql"]])
+        with self.assertNumQueries(1):
+            self.client.get(self.url, format="json")
+
+
+# Test class for the denormalized minimum price and delivery time of offers
+class TestOfferMinValues(APITestCase):
+
+    def setUp(self):
+        self.user, self.profile, self.offers = create_business_offers("minUser", 2)
+        self.offer = self.offers[0]
+
+    # Test saving a detail outside the API updates the offer minimums
+    def test_detail_save_updates_min_values(self):
+        detail = self.offer.details.get(offer_type="basic")
+        detail.price = 20
+        detail.delivery_time_in_days = 1
+        detail.save()
+        self.offer.refresh_from_db()
+        self.assertEqual((self.offer.min_price, self.offer.min_delivery_time), (20, 1))
+
+    # Test deleting the cheapest detail raises the offer minimum
+    def test_detail_delete_updates_min_values(self):
+        detail = self.offer.details.get(offer_type="basic")
+        detail.price = 20
+        detail.save()
+        detail.delete()
+        self.offer.refresh_from_db()
+        self.assertEqual(self.offer.min_price, 100)
+
+    # Test the repair command fixes stale minimums of all offers and their cards
+    def test_repair_command(self):
+        Offer.objects.update(min_price=0, min_delivery_time=0)
+        OfferCard.objects.update(min_price=0, min_delivery_time=0)
+        call_command("repair_offer_min_values", stdout=StringIO())
+        values = set(Offer.objects.values_list("min_price", "min_delivery_time"))
+        self.assertEqual(values, {(100, 3), (110, 3)})
+        self.assertEqual(set(OfferCard.objects.values_list("min_price", "min_delivery_time")), values)
+
+
+# Test class for partially updating offers
+class TestUpdateOffer(APITestCase):
+
+    def setUp(self):
+        self.user, self.profile, self.offers = create_business_offers("updateUser", 1)
+        self.offer = self.offers[0]
+        self.token, created = Token.objects.get_or_create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        self.url = reverse("offers-detail", args=[self.offer.id])
+        feature_id_cache.clear()
+
+    # Helper method building a complete detail update
+    def get_detail_data(self, offer_type, price, features):
+        return {"title": f"{offer_type} Design", "revisions": 2, "delivery_time_in_days": 2,
+                "price": price, "features": features, "offer_type": offer_type}
+
+    # Test updating offer fields and details returns the new state
+    def test_partial_update(self):
+        data = {"title": "Updated Offer", "details": [self.get_detail_data("basic", 50, ["Logo", "Flyer"])]}
+        response = self.client.patch(self.url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["title"], "Updated Offer")
+        basic = next(detail for detail in response.data["details"] if detail["offer_type"] == "basic")
+        self.assertEqual(basic["features"], ["Flyer", "Logo"])
+        self.assertEqual(basic["price"], 50)
+        self.offer.refresh_from_db()
+        self.assertEqual((self.offer.title, self.offer.min_price, self.offer.min_delivery_time),
+                         ("Updated Offer", 50, 2))
+
+    # Test the response matches a freshly loaded offer
+    def test_partial_update_response_matches_database(self):
+        data = {"details": [self.get_detail_data("premium", 10, ["Zeta", "Alpha"])]}
+        response = self.client.patch(self.url, data, format="json")
+        fresh = self.client.patch(self.url, {}, format="json")
+        self.assertEqual(response.data, fresh.data)
+
+    # Test updating an offer stays within a fixed query budget
+    def test_partial_update_query_budget(self):
+        data = {"title": "Updated Offer", "details": [
+            self.get_detail_data(offer_type, 50, ["Logo", "Flyer"]) for offer_type in ["basic", "standard", "premium"]
+        ]}
+        with self.assertNumQueries(16):
+            response = self.client.patch(self.url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    # Test an invalid detail rolls back the whole update
+    def test_partial_update_is_atomic(self):
+        data = {"title": "Updated Offer", "details": [
+            self.get_detail_data("basic", 50, ["Logo"]), self.get_detail_data("unknown", 50, ["Logo"])
+        ]}
+        response = self.client.patch(self.url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.offer.refresh_from_db()
+        self.assertEqual(self.offer.title, "Offer 0")
+        self.assertEqual(self.offer.details.get(offer_type="basic").price, 100)
+
+    # Test an incomplete detail is rejected
+    def test_partial_update_incomplete_detail(self):
+        response = self.client.patch(self.url, {"details": [{"offer_type": "basic", "price": 10}]}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+# Test class for the OfferCard read model behind the offer list
+class TestOfferCards(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user, self.profile, self.offers = create_business_offers("cardUser", 3)
+        self.url = reverse("offers-list") + "?page_size=10"
+
+    # Helper method serializing the offers the way the list did before the read model
+    def get_expected_results(self, request):
+        offers = Offer.objects.select_related("user__user").prefetch_related("details").order_by("updated_at", "pk")
+        return OfferSerializer(offers, many=True, context={"request": request}).data
+
+    # Test the list served from cards matches the offer serializer output
+    def test_cards_match_offer_serializer(self):
+        response = self.client.get(self.url, format="json")
+        expected = self.get_expected_results(response.wsgi_request)
+        self.assertEqual(json.loads(response.content)["results"], json.loads(json.dumps(expected, cls=JSONEncoder)))
+
+    # Test cards follow writes to offers, details and owners
+    def test_cards_follow_writes(self):
+        offer = self.offers[0]
+        offer.title = "Renamed"
+        offer.save()
+        detail = offer.details.get(offer_type="basic")
+        detail.price = 5
+        detail.save()
+        self.user.last_name = "Muster"
+        self.user.save()
+        card = OfferCard.objects.get(offer=offer)
+        self.assertEqual((card.title, card.min_price, card.last_name), ("Renamed", 5, "Muster"))
+        detail.delete()
+        card.refresh_from_db()
+        self.assertEqual(len(card.detail_ids), 2)
+
+    # Test deleting an offer removes its card
+    def test_card_deleted_with_offer(self):
+        self.offers[0].delete()
+        self.assertFalse(OfferCard.objects.filter(offer_id=self.offers[0].id).exists())
+
+    # Test the list reads only the card table
+    def test_list_reads_single_table(self):
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(self.url, format="json")
+        tables = {table for query in context.captured_queries
+                  for table in ["offer_app_offer\"", "user_auth_app_profile", "auth_user"]
+                  if table in query["sql"]}
+        self.assertEqual(tables, set())
+
+    # Test the rebuild command recreates missing cards
+    def test_rebuild_command(self):
+        OfferCard.objects.all().delete()
+        call_command("rebuild_offer_cards", stdout=StringIO())
+        self.assertEqual(OfferCard.objects.count(), 3)
+
+    # Test a failing rebuild keeps the existing cards
+    def test_rebuild_command_is_atomic(self):
+        with mock.patch("offer_app.management.commands.rebuild_offer_cards.sync_offer_cards", side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                call_command("rebuild_offer_cards", stdout=StringIO())
+        self.assertEqual(OfferCard.objects.count(), 3)
+
+
+# Test class for conditional GET requests on offers and offer details
+class TestOfferConditionalGet(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user, self.profile, self.offers = create_business_offers("etagUser", 2)
+        self.token, created = Token.objects.get_or_create(user=self.user)
+        self.offer = self.offers[0]
+
+    # Helper method checking a URL answers 304 to its own ETag until the offer changes
+    def assert_conditional(self, url, authenticate=True, queries=1):
+        if authenticate:
+            self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        response = self.client.get(url, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response["ETag"]
+        with self.assertNumQueries(queries):
+            not_modified = self.client.get(url, format="json", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(not_modified["ETag"], etag)
+        detail = self.offer.details.get(offer_type="basic")
+        detail.price = 1
+        detail.save()
+        changed = self.client.get(url, format="json", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(changed["ETag"], etag)
+
+    # Test the offer list answers 304 with only the generation lookup
+    def test_offer_list(self):
+        self.assert_conditional(reverse("offers-list"), authenticate=False, queries=1)
+
+    # Test a single offer answers 304 from its updated_at
+    def test_offer_retrieve(self):
+        url = reverse("offers-detail", args=[self.offer.id])
+        self.assert_conditional(url, queries=2)
+        response = self.client.get(url, format="json")
+        self.assertIn("Last-Modified", response)
+
+    # Test an offer detail answers 304 from its offer's updated_at
+    def test_offer_detail_retrieve(self):
+        detail = self.offer.details.get(offer_type="standard")
+        self.assert_conditional(reverse("offerdetail", args=[detail.id]), queries=2)
+
+    # Test feature changes made through the many-to-many API and feature renames change the ETag
+    def test_offer_detail_feature_changes(self):
+        detail = self.offer.details.get(offer_type="standard")
+        feature = Feature.objects.create(title="Source Files")
+        url = reverse("offerdetail", args=[detail.id])
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        for change in [
+            lambda: detail.features.set([feature]),
+            lambda: setattr(feature, "title", "Vector Files") or feature.save(),
+            lambda: feature.offerdetail_set.clear(),
+        ]:
+            etag = self.client.get(url, format="json")["ETag"]
+            change()
+            response = self.client.get(url, format="json", HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["features"], [])
+
+    # Test a missing offer still returns 404
+    def test_offer_retrieve_not_found(self):
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        response = self.client.get(reverse("offers-detail", args=[9999]), format="json")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+# Test class for the location filter of the offer list
+class TestOfferNearFilter(APITestCase):
+
+    def setUp(self):
+        self.offers = {}
+        for location in ["Berlin", "Potsdam, Brandenburg", "Hamburg"]:
+            username = location.split(",")[0]
+            user, profile, offers = create_business_offers(username, 1)
+            profile.location = location
+            profile.save()
+            self.offers[username] = offers[0].id
+
+    # Helper method returning the offer ids of a near query
+    def get_near_ids(self, params):
+        response = self.client.get(reverse("offers-list") + params, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return {offer["id"] for offer in response.data["results"]}
+
+    # Test profiles are geocoded from the bundled gazetteer
+    def test_profile_geocoded(self):
+        profile = Profile.objects.get(location="Potsdam, Brandenburg")
+        self.assertAlmostEqual(profile.latitude, 52.39, places=2)
+        self.assertIsNotNone(profile.grid_lat)
+        customer = Profile.objects.create(
+            type="customer", location="Berlin", user=User.objects.create_user(username="nearCustomer"))
+        self.assertIsNone(customer.latitude)
+
+    # Test saving only the location also stores the new coordinates
+    def test_location_update_fields(self):
+        profile = Profile.objects.get(location="Berlin")
+        profile.location = "Hamburg"
+        profile.save(update_fields=["location"])
+        profile.refresh_from_db()
+        self.assertAlmostEqual(profile.latitude, 53.55, places=1)
+        self.assertEqual(self.get_near_ids("?near=53.55,9.99"), {self.offers["Hamburg"], self.offers["Berlin"]})
+
+    # Test the radius limits the offers by distance
+    def test_near_radius(self):
+        self.assertEqual(self.get_near_ids("?near=52.52,13.405&radius=30"),
+                         {self.offers["Berlin"], self.offers["Potsdam"]})
+        self.assertEqual(self.get_near_ids("?near=52.52,13.405&radius=10"), {self.offers["Berlin"]})
+        self.assertEqual(self.get_near_ids("?near=53.55,9.99"), {self.offers["Hamburg"]})
+
+    # Test a changed location moves the offers
+    def test_location_change(self):
+        self.get_near_ids("?near=53.55,9.99")
+        profile = Profile.objects.get(location="Berlin")
+        profile.location = "Hamburg"
+        profile.save()
+        self.assertEqual(self.get_near_ids("?near=53.55,9.99"), {self.offers["Hamburg"], self.offers["Berlin"]})
+
+    # Test invalid coordinates and radii are rejected
+    def test_near_invalid(self):
+        for params in ["?near=abc", "?near=95,10", "?near=52.5,13.4&radius=-1", "?near=52.5,13.4&radius=5000"]:
+            with self.subTest(params=params):
+                response = self.client.get(reverse("offers-list") + params, format="json")
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+# Test class for the popularity counters and ordering of offers
+class TestOfferPopularity(APITestCase):
+
+    def setUp(self):
+        self.user, self.profile, self.offers = create_business_offers("popularUser", 3)
+        self.customer_user = User.objects.create_user(username="popularCustomer", password="Hallo123@")
+        Profile.objects.create(type="customer", user=self.customer_user)
+        self.business_token, created = Token.objects.get_or_create(user=self.user)
+        self.customer_token, created = Token.objects.get_or_create(user=self.customer_user)
+
+    # Helper method placing orders for the basic detail of an offer
+    def place_orders(self, offer, count):
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.customer_token.key)
+        detail = offer.details.get(offer_type="basic")
+        return [
+            self.client.post(reverse("orders-list"), {"offer_detail_id": detail.id}, format="json").data["id"]
+            for _ in range(count)
+        ]
+
+    # Helper method returning the offer ids of the list in the given ordering
+    def get_ordered_ids(self, ordering, pagination=""):
+        self.client.credentials()
+        response = self.client.get(reverse("offers-list") + f"?ordering={ordering}{pagination}", format="json")
+        return [offer["id"] for offer in response.data["results"]]
+
+    # Test placed orders are counted on the offer and its card
+    def test_order_counts(self):
+        self.place_orders(self.offers[1], 2)
+        offer = Offer.objects.get(pk=self.offers[1].pk)
+        card = OfferCard.objects.get(offer=offer)
+        self.assertEqual((offer.order_count, offer.recent_order_count), (2, 2))
+        self.assertEqual((card.order_count, card.recent_order_count), (2, 2))
+
+    # Test ordering by popularity lists the most ordered offers first in both pagination modes
+    def test_ordering_popularity(self):
+        self.place_orders(self.offers[2], 2)
+        self.place_orders(self.offers[0], 1)
+        expected = [self.offers[2].id, self.offers[0].id, self.offers[1].id]
+        self.assertEqual(self.get_ordered_ids("popularity"), expected)
+        self.assertEqual(self.get_ordered_ids("popularity", "&pagination=cursor"), expected)
+        self.assertEqual(self.get_ordered_ids("-popularity")[0], self.offers[1].id)
+
+    # Test following the cursors of the counter orderings page by page returns every offer once
+    def test_ordering_counters_cursor_pages(self):
+        self.place_orders(self.offers[2], 2)
+        self.place_orders(self.offers[0], 1)
+        self.client.credentials()
+        for ordering, expected in [
+            ("popularity", [self.offers[2].id, self.offers[0].id, self.offers[1].id]),
+            ("-popularity", [self.offers[1].id, self.offers[0].id, self.offers[2].id]),
+            ("trending", [self.offers[2].id, self.offers[0].id, self.offers[1].id]),
+        ]:
+            with self.subTest(ordering=ordering):
+                ids, url = [], reverse("offers-list") + f"?ordering={ordering}&pagination=cursor&page_size=1"
+                while url:
+                    response = self.client.get(url, format="json")
+                    self.assertEqual(response.status_code, status.HTTP_200_OK)
+                    ids += [offer["id"] for offer in response.data["results"]]
+                    url = response.data["next"]
+                self.assertEqual(ids, expected)
+
+    # Test completing an order keeps it counted while cancelling one removes it
+    def test_status_changes(self):
+        completed_id, cancelled_id = self.place_orders(self.offers[0], 2)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.business_token.key)
+        response = self.client.patch(
+            reverse("orders-detail", args=[completed_id]), {"status": "completed"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(OfferCard.objects.get(offer=self.offers[0]).order_count, 2)
+        response = self.client.patch(
+            reverse("orders-detail", args=[cancelled_id]), {"status": "cancelled"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(OfferCard.objects.get(offer=self.offers[0]).order_count, 1)
+
+    # Test the refresh command expires orders outside the recent window
+    def test_refresh_command(self):
+        order_id = self.place_orders(self.offers[0], 1)[0]
+        Order.objects.filter(pk=order_id).update(created_at=timezone.now() - timedelta(days=60))
+        call_command("refresh_offer_popularity", stdout=StringIO())
+        card = OfferCard.objects.get(offer=self.offers[0])
+        self.assertEqual((card.order_count, card.recent_order_count), (1, 0))
+
+
+# Test class for the title autocomplete endpoint
+class TestOfferSuggest(APITestCase):
+
+    def setUp(self):
+        suggestion_index.clear()
+        self.user, self.profile, self.offers = create_business_offers("suggestUser", 2)
+        Offer.objects.filter(pk=self.offers[0].pk).update(title="Website Logo Design")
+        Feature.objects.create(title="Logo Variants")
+        self.url = reverse("offers-suggest")
+
+    # Helper method returning the suggested titles for a query
+    def get_titles(self, query):
+        response = self.client.get(self.url, {"q": query}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [suggestion["title"] for suggestion in response.data]
+
+    # Test offer and feature titles match on any word prefix, case-insensitively
+    def test_suggest_prefix(self):
+        self.assertEqual(self.get_titles("LOG"), ["Logo Variants", "Website Logo Design"])
+        self.assertEqual(self.get_titles("web"), ["Website Logo Design"])
+        self.assertEqual(self.get_titles("xyz"), [])
+        self.assertEqual(self.get_titles(""), [])
+
+    # Test suggestions are answered from memory once the index is built
+    def test_suggest_without_queries(self):
+        self.get_titles("log")
+        with self.assertNumQueries(0):
+            self.get_titles("offer")
+
+    # Test committed writes update the index incrementally
+    def test_suggest_incremental_updates(self):
+        self.get_titles("log")
+        with self.captureOnCommitCallbacks(execute=True):
+            Offer.objects.create(user=self.profile, title="Logo Animation", description="Motion",
+                                 min_price=50, min_delivery_time=2)
+            resolve_feature_ids(["Animated Logo"])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.offers[0].delete()
+        with self.assertNumQueries(0):
+            titles = self.get_titles("logo")
+        self.assertEqual(titles, ["Logo Variants", "Logo Animation", "Animated Logo"])
+
+    # Test more popular titles rank first among equally relevant matches
+    def test_suggest_ranks_by_popularity(self):
+        Offer.objects.filter(pk=self.offers[1].pk).update(title="Logo Design Bundle", order_count=5)
+        self.assertEqual(self.get_titles("logo"), ["Logo Design Bundle", "Logo Variants", "Website Logo Design"])
+
+    # Test a stale index keeps answering while it is reloaded in the background, keeping concurrent writes
+    def test_stale_index_refreshes_in_background(self):
+        self.get_titles("log")
+        Offer.objects.filter(pk=self.offers[1].pk).update(title="Logo Refresh")
+        with mock.patch.object(suggestion_index, "start_refresh") as start_refresh, \
+                self.settings(SUGGEST_INDEX_TTL=-1), self.assertNumQueries(0):
+            self.assertNotIn("Logo Refresh", self.get_titles("logo"))
+        start_refresh.assert_called_once()
+        suggestion_index.refresh()
+        self.assertIn("Logo Refresh", self.get_titles("logo"))
+
+    # Test the limit parameter caps the suggestions
+    def test_suggest_limit(self):
+        response = self.client.get(self.url, {"q": "offer", "limit": 1}, format="json")
+        self.assertEqual(len(response.data), 1)
+        response = self.client.get(self.url, {"q": "offer", "limit": "x"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
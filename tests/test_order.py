@@ -0,0 +1,316 @@
+from io import StringIO
+import json
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+from rest_framework.utils.encoders import JSONEncoder
+
+from offer_app.models import Feature
+from order_app.api.pagination import OrderPagination
+from order_app.models import BusinessOrderStats, Order
+from tests.test_offer import create_business_offers
+from user_auth_app.models import Profile
+
+
+# Test class for the visibility of orders in the order list
+class TestOrderVisibility(APITestCase):
+
+    def setUp(self):
+        self.business_user, self.business, offers = create_business_offers("orderBusiness", 1)
+        self.detail = offers[0].details.first()
+        self.customer_user = User.objects.create_user(username="orderCustomer", password="Hallo123@")
+        self.customer = Profile.objects.create(type="customer", user=self.customer_user)
+        self.other_user = User.objects.create_user(username="otherCustomer", password="Hallo123@")
+        self.other = Profile.objects.create(type="customer", user=self.other_user)
+        self.order = Order.objects.create(
+            customer_user=self.customer, business_user=self.business, offer_detail=self.detail)
+        Order.objects.create(customer_user=self.other, business_user=self.business, offer_detail=self.detail)
+
+    # Helper method returning the order ids listed for a user
+    def get_order_ids(self, user):
+        token, created = Token.objects.get_or_create(user=user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+        response = self.client.get(reverse("orders-list"), format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return sorted(order["id"] for order in response.data)
+
+    # Test customers and business users only see the orders they take part in
+    def test_participants_see_their_orders(self):
+        self.assertEqual(self.get_order_ids(self.customer_user), [self.order.id])
+        self.assertEqual(self.get_order_ids(self.business_user), sorted(Order.objects.values_list("id", flat=True)))
+        self.assertEqual(len(self.get_order_ids(self.other_user)), 1)
+
+    # Test the queryset matches the former OR filter without duplicates
+    def test_visible_to_matches_or_filter(self):
+        for user in [self.customer_user, self.business_user, self.other_user]:
+            with self.subTest(user=user.username):
+                profile = user.profiles.first()
+                expected = Order.objects.filter(customer_user=profile) | Order.objects.filter(business_user=profile)
+                self.assertEqual(list(Order.objects.visible_to(user)), list(expected))
+
+
+# Test class for cursor pagination and streaming of the order list
+class TestOrderListModes(APITestCase):
+
+    def setUp(self):
+        self.business_user, self.business, offers = create_business_offers("pagedBusiness", 1)
+        detail = offers[0].details.first()
+        customer = Profile.objects.create(
+            type="customer", user=User.objects.create_user(username="pagedCustomer", password="Hallo123@"))
+        self.order_ids = [
+            Order.objects.create(customer_user=customer, business_user=self.business, offer_detail=detail).id
+            for _ in range(7)
+        ]
+        token, created = Token.objects.get_or_create(user=self.business_user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+        self.url = reverse("orders-list")
+
+    # Test following the cursors returns every order once in creation order
+    def test_cursor_pagination(self):
+        ids, url = [], self.url + "?pagination=cursor&page_size=3"
+        while url:
+            response = self.client.get(url, format="json")
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            ids += [order["id"] for order in response.data["results"]]
+            url = response.data["next"]
+        self.assertEqual(ids, self.order_ids)
+
+    # Test the default list stays a plain unpaginated array
+    def test_default_list(self):
+        response = self.client.get(self.url, format="json")
+        self.assertIsInstance(response.data, list)
+        self.assertEqual(len(response.data), 7)
+
+    # Test the default list is capped instead of loading every order
+    def test_default_list_is_capped(self):
+        with mock.patch.object(OrderPagination, "max_unpaginated_results", 5):
+            response = self.client.get(self.url, format="json")
+        self.assertIsInstance(response.data, list)
+        self.assertEqual(len(response.data), 5)
+
+    # Test streaming returns the same orders as one JSON array
+    def test_stream(self):
+        expected = self.client.get(self.url, format="json").data
+        response = self.client.get(self.url + "?stream=true")
+        self.assertEqual(response["Content-Type"], "application/json")
+        streamed = json.loads(b"".join(response.streaming_content))
+        self.assertEqual([order["id"] for order in streamed], self.order_ids)
+        self.assertEqual(sorted(streamed, key=lambda order: order["id"]),
+                         sorted(json.loads(json.dumps(expected, cls=JSONEncoder)), key=lambda order: order["id"]))
+
+
+# Test class for the offer detail terms snapshotted onto orders
+class TestOrderSnapshot(APITestCase):
+
+    def setUp(self):
+        self.business_user, self.business, offers = create_business_offers("snapshotBusiness", 1)
+        self.detail = offers[0].details.get(offer_type="basic")
+        self.detail.features.set([Feature.objects.create(title="Logo"), Feature.objects.create(title="Colors")])
+        self.customer_user = User.objects.create_user(username="snapshotCustomer", password="Hallo123@")
+        self.customer = Profile.objects.create(type="customer", user=self.customer_user)
+        token, created = Token.objects.get_or_create(user=self.customer_user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+        self.url = reverse("orders-list")
+
+    # Test a new order copies the terms of its offer detail
+    def test_create_snapshots_terms(self):
+        response = self.client.post(self.url, {"offer_detail_id": self.detail.id}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["title"], "basic 0")
+        self.assertEqual(response.data["price"], self.detail.price)
+        self.assertEqual(response.data["features"], ["Colors", "Logo"])
+        self.assertEqual(response.data["offer_type"], "basic")
+
+    # Test editing the offer detail afterwards leaves the order terms unchanged
+    def test_offer_edit_keeps_order_terms(self):
+        order_id = self.client.post(self.url, {"offer_detail_id": self.detail.id}, format="json").data["id"]
+        self.detail.title = "changed"
+        self.detail.price = 999
+        self.detail.revisions = 5
+        self.detail.save()
+        self.detail.features.clear()
+        response = self.client.get(reverse("orders-detail", args=[order_id]), format="json")
+        self.assertEqual(response.data["title"], "basic 0")
+        self.assertEqual(response.data["price"], 100)
+        self.assertEqual(response.data["revisions"], 1)
+        self.assertEqual(response.data["features"], ["Colors", "Logo"])
+
+    # Test the order list needs the same number of queries regardless of its length
+    def test_list_query_count_is_constant(self):
+        def count_list_queries():
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(self.url, format="json")
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            return len(queries)
+
+        self.client.post(self.url, {"offer_detail_id": self.detail.id}, format="json")
+        single = count_list_queries()
+        for _ in range(5):
+            self.client.post(self.url, {"offer_detail_id": self.detail.id}, format="json")
+        self.assertEqual(count_list_queries(), single)
+
+
+# Test class for the per business order counters
+class TestBusinessOrderStats(APITestCase):
+
+    def setUp(self):
+        self.business_user, self.business, offers = create_business_offers("statsBusiness", 1)
+        self.detail = offers[0].details.first()
+        self.customer_user = User.objects.create_user(username="statsCustomer", password="Hallo123@")
+        Profile.objects.create(type="customer", user=self.customer_user)
+        self.admin = User.objects.create_superuser(username="statsAdmin", password="Hallo123@")
+
+    # Helper method authenticating the client as the given user
+    def login(self, user):
+        token, created = Token.objects.get_or_create(user=user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+
+    # Helper method returning the in-progress and completed counts of the business user
+    def get_counts(self):
+        self.login(self.customer_user)
+        order_count = self.client.get(reverse("order-count", args=[self.business.id])).data["order_count"]
+        completed = self.client.get(reverse("completed-order", args=[self.business.id])).data["completed_order_count"]
+        return order_count, completed
+
+    # Helper method returning the stored counters of the business user
+    def get_stats(self):
+        stats = BusinessOrderStats.objects.get(business_user=self.business)
+        return stats.in_progress_count, stats.completed_count, stats.cancelled_count
+
+    # Test creating, updating and deleting orders keeps the counters in step, also when a change is rejected
+    def test_counters_follow_orders(self):
+        self.assertEqual(self.get_counts(), (0, 0))
+        self.login(self.customer_user)
+        order_ids = [
+            self.client.post(reverse("orders-list"), {"offer_detail_id": self.detail.id}, format="json").data["id"]
+            for _ in range(3)
+        ]
+        self.login(self.business_user)
+        url = reverse("orders-detail", args=[order_ids[0]])
+        self.client.patch(url, {"status": "completed"}, format="json")
+        self.client.patch(url, {"status": "completed"}, format="json")
+        self.client.patch(reverse("orders-detail", args=[order_ids[1]]), {"status": "cancelled"}, format="json")
+        self.assertEqual(self.get_stats(), (1, 1, 1))
+        self.assertEqual(self.get_counts(), (1, 1))
+        self.login(self.admin)
+        self.client.delete(reverse("orders-detail", args=[order_ids[0]]))
+        self.assertEqual(self.get_stats(), (1, 0, 1))
+
+    # Test the count views read the counters with a single query
+    def test_count_view_queries(self):
+        self.login(self.customer_user)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse("order-count", args=[self.business.id]))
+        self.assertEqual(len([query for query in queries if "order_app_businessorderstats" in query["sql"]]), 1)
+        self.assertFalse([query for query in queries if 'FROM "order_app_order"' in query["sql"]])
+
+    # Test the reconcile command rebuilds the counters from the orders
+    def test_rebuild_command(self):
+        customer = Profile.objects.get(user=self.customer_user)
+        Order.objects.create(customer_user=customer, business_user=self.business, offer_detail=self.detail)
+        Order.objects.create(
+            customer_user=customer, business_user=self.business, offer_detail=self.detail, status="completed")
+        BusinessOrderStats.objects.create(business_user=customer, completed_count=7)
+        call_command("rebuild_order_stats", stdout=StringIO())
+        self.assertEqual(self.get_stats(), (1, 1, 0))
+        self.assertFalse(BusinessOrderStats.objects.filter(business_user=customer).exists())
+
+
+# Test class for the batch order count endpoint
+class TestBusinessOrderCounts(APITestCase):
+
+    def setUp(self):
+        self.first_user, self.first, first_offers = create_business_offers("batchFirst", 1)
+        self.second_user, self.second, second_offers = create_business_offers("batchSecond", 1)
+        self.customer_user = User.objects.create_user(username="batchCustomer", password="Hallo123@")
+        self.customer = Profile.objects.create(type="customer", user=self.customer_user)
+        token, created = Token.objects.get_or_create(user=self.customer_user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+        for detail in [first_offers[0].details.first()] * 2 + [second_offers[0].details.first()]:
+            self.client.post(reverse("orders-list"), {"offer_detail_id": detail.id}, format="json")
+        self.url = reverse("order-counts")
+
+    # Test the batch matches the single count endpoints in the requested order
+    def test_batch_matches_single_endpoints(self):
+        ids = [self.second.id, self.customer.id, self.first.id]
+        response = self.client.get(self.url + "?business_user_ids=" + ",".join(map(str, ids)))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([entry["business_user_id"] for entry in response.data], [self.second.id, self.first.id])
+        for entry in response.data:
+            pk = entry["business_user_id"]
+            self.assertEqual(
+                entry["order_count"], self.client.get(reverse("order-count", args=[pk])).data["order_count"])
+            self.assertEqual(
+                entry["completed_order_count"],
+                self.client.get(reverse("completed-order", args=[pk])).data["completed_order_count"])
+        self.assertEqual(response.data[1]["order_count"], 2)
+
+    # Test the batch is answered with one query besides authentication
+    def test_batch_query_count(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.url + f"?business_user_ids={self.first.id},{self.second.id}")
+        self.assertEqual(len([query for query in queries if "user_auth_app_profile" in query["sql"]]), 1)
+
+    # Test invalid id lists are rejected
+    def test_invalid_ids(self):
+        for params in ["", "?business_user_ids=", "?business_user_ids=1,x",
+                       "?business_user_ids=" + ",".join(map(str, range(1, 102)))]:
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get(self.url + params).status_code, status.HTTP_400_BAD_REQUEST)
+
+
+# Test class for the order status state machine
+class TestOrderStatusTransitions(APITestCase):
+
+    def setUp(self):
+        self.business_user, self.business, offers = create_business_offers("transitionBusiness", 1)
+        customer = Profile.objects.create(
+            type="customer", user=User.objects.create_user(username="transitionCustomer", password="Hallo123@"))
+        self.order = Order.objects.create(
+            customer_user=customer, business_user=self.business, offer_detail=offers[0].details.first())
+        token, created = Token.objects.get_or_create(user=self.business_user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+        self.url = reverse("orders-detail", args=[self.order.id])
+
+    # Test an order in progress can be completed and its version is increased
+    def test_complete_order(self):
+        response = self.client.patch(self.url, {"status": "completed", "version": 0}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual((response.data["status"], response.data["version"]), ("completed", 1))
+        self.assertEqual(Order.objects.get(pk=self.order.pk).version, 1)
+
+    # Test final statuses cannot be left
+    def test_final_status_conflict(self):
+        self.client.patch(self.url, {"status": "cancelled"}, format="json")
+        for new_status in ["in_progress", "completed", "cancelled"]:
+            with self.subTest(status=new_status):
+                response = self.client.patch(self.url, {"status": new_status}, format="json")
+                self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(Order.objects.get(pk=self.order.pk).status, "cancelled")
+
+    # Test a change based on an outdated version is rejected
+    def test_stale_version_conflict(self):
+        self.client.patch(self.url, {"status": "completed"}, format="json")
+        response = self.client.patch(self.url, {"status": "cancelled", "version": 0}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
+    # Test of two changes of the same order read at once only the first one is applied
+    def test_concurrent_transition(self):
+        first, second = Order.objects.get(pk=self.order.pk), Order.objects.get(pk=self.order.pk)
+        self.assertTrue(Order.objects.transition(first, "completed"))
+        self.assertFalse(Order.objects.transition(second, "cancelled"))
+        self.assertEqual(Order.objects.get(pk=self.order.pk).status, "completed")
+
+    # Test invalid statuses are still rejected as bad requests
+    def test_invalid_status(self):
+        for data in [{}, {"status": "unknown"}, {"status": "completed", "version": "x"}]:
+            with self.subTest(data=data):
+                response = self.client.patch(self.url, data, format="json")
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,55 @@
+from django.contrib.auth.models import User
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, APITestCase
+
+from offer_app.api.serializers import OfferCardSerializer, OfferCardValuesSerializer
+from offer_app.cards import sync_offer_cards
+from offer_app.models import Offer, OfferCard
+from tests.test_offer import create_business_offers
+from user_auth_app.api.serializers import (
+    BusinessSerializer, BusinessValuesSerializer, CustomerSerializer, CustomerValuesSerializer,
+    ProfileSerializer, ProfileValuesSerializer)
+from user_auth_app.models import Profile, ProfileFile
+
+
+# Test class comparing the values() list serializers with the model serializers
+class TestValuesSerializers(APITestCase):
+
+    def setUp(self):
+        self.user, self.profile, self.offers = create_business_offers("projectionUser", 3)
+        Offer.objects.filter(pk=self.offers[0].pk).update(image="offer-img/logo.png", image_hash="a" * 64)
+        self.profile.file = ProfileFile.objects.create(file="profile-img/me.png", file_hash="b" * 64)
+        self.profile.save()
+        customer = User.objects.create_user(username="projectionCustomer", password="Hallo123@")
+        Profile.objects.create(type="customer", user=customer, file=ProfileFile.objects.create())
+        Profile.objects.create(type="customer", user=User.objects.create_user(username="plainCustomer"))
+        self.context = {"request": Request(APIRequestFactory().get("/api/offers/"))}
+
+    # Helper method asserting both serializers render the same bytes
+    def assert_identical(self, serializer_class, values_serializer_class, queryset):
+        renderer = JSONRenderer()
+        expected = serializer_class(queryset, many=True, context=self.context).data
+        actual = values_serializer_class(context=self.context).serialize(queryset)
+        self.assertEqual(renderer.render(actual), renderer.render(expected))
+
+    # Test offer cards render identically
+    def test_offer_cards(self):
+        sync_offer_cards()
+        self.assert_identical(OfferCardSerializer, OfferCardValuesSerializer, OfferCard.objects.all())
+
+    # Test profiles with and without files render identically
+    def test_profiles(self):
+        self.assert_identical(ProfileSerializer, ProfileValuesSerializer, Profile.objects.all())
+        self.assert_identical(BusinessSerializer, BusinessValuesSerializer, Profile.objects.filter(type="business"))
+        self.assert_identical(CustomerSerializer, CustomerValuesSerializer, Profile.objects.filter(type="customer"))
+
+    # Test the business list endpoint returns the file URL with a constant number of queries
+    def test_business_list_endpoint(self):
+        token, created = Token.objects.get_or_create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("business_profiles"))
+        self.assertTrue(response.data[0]["file"].endswith("profile-img/me.png"))
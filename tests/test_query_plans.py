@@ -0,0 +1,100 @@
+import re
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+from offer_app.models import Offer
+from order_app.models import Order
+from review_app.models import Review
+from user_auth_app.models import Profile
+
+
+# Tables whose filtered queries must be answered from an index.
+INDEXED_TABLES = {
+    "offer_app_offer", "offer_app_offercard", "order_app_order", "review_app_review", "user_auth_app_profile",
+}
+
+
+# Test class checking that filtered API queries use indexes instead of table scans
+class TestQueryPlans(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="exampleUsername", email="example@test.de", password="Hallo123@")
+        self.profile = Profile.objects.create(type="business", user=self.user)
+        self.customer = Profile.objects.create(
+            type="customer", user=User.objects.create_user(username="customerUser", password="Hallo123@"))
+        self.token, created = Token.objects.get_or_create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        Offer.objects.create(user=self.profile, title="Logo", description="Logo",
+                             min_price=100, min_delivery_time=3)
+        Order.objects.create(customer_user=self.customer, business_user=self.profile)
+        Review.objects.create(business_user=self.profile, reviewer=self.customer,
+                              rating=5, description="Great")
+
+    # Helper method returning the plan rows that scan an indexed table.
+    # Unfiltered lists may walk an index in ordering order; filtered queries must search one.
+    def get_table_scans(self, url, allow_index_scans=False):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        scans = []
+        with connection.cursor() as cursor:
+            for query in context.captured_queries:
+                if not query["sql"].lstrip().upper().startswith("SELECT"):
+                    continue
+                cursor.execute("EXPLAIN QUERY PLAN " + query["sql"])
+                for row in cursor.fetchall():
+                    detail = row[-1]
+                    match = re.match(r"SCAN (\w+)", detail)
+                    if match and match.group(1) in INDEXED_TABLES:
+                        if not (allow_index_scans and "USING" in detail and "INDEX" in detail):
+                            scans.append(detail)
+        return scans
+
+    # Test offer list filters search an index instead of scanning
+    def test_offer_list_uses_index(self):
+        base = reverse("offers-list")
+        for params in [
+            f"?creator_id={self.profile.id}",
+            "?min_price=50",
+            "?min_price=50&ordering=min_price",
+            "?max_delivery_time=5",
+            "?near=52.52,13.405&radius=30",
+        ]:
+            with self.subTest(params=params):
+                self.assertEqual(self.get_table_scans(base + params), [])
+
+    # Test unfiltered offer list orderings walk an index instead of sorting the table
+    def test_offer_list_orderings_use_index(self):
+        base = reverse("offers-list")
+        for params in ["?ordering=-updated_at", "?ordering=popularity", "?ordering=trending&pagination=cursor"]:
+            with self.subTest(params=params):
+                self.assertEqual(self.get_table_scans(base + params, allow_index_scans=True), [])
+
+    # Test the order list of a participant uses an index
+    def test_order_list_uses_index(self):
+        for params in ["", "?pagination=cursor"]:
+            with self.subTest(params=params):
+                self.assertEqual(self.get_table_scans(reverse("orders-list") + params), [])
+
+    # Test order count endpoints use an index
+    def test_order_counts_use_index(self):
+        for name in ["order-count", "completed-order"]:
+            with self.subTest(name=name):
+                url = reverse(name, args=[self.profile.id])
+                self.assertEqual(self.get_table_scans(url), [])
+        url = reverse("order-counts") + f"?business_user_ids={self.profile.id}"
+        self.assertEqual(self.get_table_scans(url), [])
+
+    # Test review list filters and orderings use an index
+    def test_review_list_uses_index(self):
+        base = reverse("reviews-list") + f"?business_user_id={self.profile.id}"
+        for params in ["", "&ordering=updated_at", "&ordering=-rating"]:
+            with self.subTest(params=params):
+                self.assertEqual(self.get_table_scans(base + params), [])
@@ -0,0 +1,73 @@
+import hashlib
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+from offer_app.models import Offer
+from tests.test_offer import create_business_offers
+
+PNG_CONTENT = b"\x89PNG\r\n\x1a\n" + b"\x00" * 2048
+
+
+# Test class for the streaming upload handler
+class TestStreamingUploads(APITestCase):
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        self.user, self.profile, offers = create_business_offers("uploadUser", 1)
+        self.offer = offers[0]
+        self.token, created = Token.objects.get_or_create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        self.url = reverse("offers-detail", args=[self.offer.id])
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    # Helper method uploading a new offer image
+    def upload(self, content, name="logo.png"):
+        image = SimpleUploadedFile(name, content, content_type="image/png")
+        return self.client.patch(self.url, {"image": image}, format="multipart")
+
+    # Helper method listing the partially streamed files left behind
+    def get_leftovers(self):
+        upload_dir = os.path.join(self.media_root, ".uploads")
+        return os.listdir(upload_dir) if os.path.isdir(upload_dir) else []
+
+    # Test a valid image is moved into storage and its streamed hash reaches the pipeline
+    def test_upload_image(self):
+        executor = mock.Mock()
+        with mock.patch("core.images.get_executor", return_value=executor):
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.upload(PNG_CONTENT)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.offer.refresh_from_db()
+        self.assertTrue(self.offer.image.name.startswith("offer-img/"))
+        with self.offer.image.open("rb") as file:
+            self.assertEqual(file.read(), PNG_CONTENT)
+        self.assertEqual(executor.submit.call_args.args[-1], hashlib.sha256(PNG_CONTENT).hexdigest())
+        self.assertEqual(self.get_leftovers(), [])
+
+    # Test uploads larger than the limit are rejected mid-stream
+    @override_settings(UPLOAD_MAX_SIZE=1024)
+    def test_upload_too_large(self):
+        response = self.upload(PNG_CONTENT)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Offer.objects.get(pk=self.offer.pk).image.name, self.offer.image.name)
+        self.assertEqual(self.get_leftovers(), [])
+
+    # Test files that are not images are rejected by their content, not their name
+    def test_upload_invalid_type(self):
+        response = self.upload(b"#!/bin/sh\necho not an image\n")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.get_leftovers(), [])
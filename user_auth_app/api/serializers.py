@@ -1,10 +1,21 @@
 from django.contrib.auth.models import User
+from django.core.files.storage import default_storage
 
 from rest_framework import serializers
 
+from core.images import get_variant_urls
+from core.links import get_link_builder
+from core.projections import ValuesSerializer
 from user_auth_app.models import TYPE_CHOICES, Profile
 
 
+# Returns the absolute URL of a stored profile file, or None without one.
+def get_file_url(name, request=None):
+    if not name:
+        return None
+    return get_link_builder(request).absolute(default_storage.url(name))
+
+
 # Serializer for user registration, including password confirmation and type.
 class ProfilRegistrationSerializer(serializers.Serializer):
     username = serializers.CharField(max_length=255)
@@ -49,6 +60,7 @@ class ProfileSerializer(serializers.ModelSerializer):
     first_name = serializers.SerializerMethodField()
     last_name = serializers.SerializerMethodField()
     file = serializers.SerializerMethodField()
+    file_variants = serializers.SerializerMethodField()
     email = serializers.SerializerMethodField()
 
     class Meta:
@@ -61,6 +73,7 @@ class ProfileSerializer(serializers.ModelSerializer):
             "first_name",
             "last_name",
             "file",
+            "file_variants",
             "location",
             "tel",
             "description",
@@ -87,10 +100,16 @@ class ProfileSerializer(serializers.ModelSerializer):
             return obj.user.last_name
         return None
 
-    # Get the user's file if it exists.
+    # Get the URL of the user's file if it exists.
     def get_file(self, obj):
         if obj.file:
-            return obj.file.file
+            return get_file_url(obj.file.file.name, self.context.get("request"))
+
+    # Get the URLs of the generated variants of the user's file if they exist.
+    def get_file_variants(self, obj):
+        if obj.file:
+            return get_variant_urls(obj.file.file_hash, self.context.get("request"))
+        return None
 
     # Get the user's email from the related user.
     def get_email(self, obj):
@@ -140,10 +159,10 @@ class BusinessSerializer(serializers.ModelSerializer):
             return obj.user.last_name
         return None
 
-    # Get the user's file if it exists.
+    # Get the URL of the user's file if it exists.
     def get_file(self, obj):
         if obj.file:
-            return obj.file
+            return get_file_url(obj.file.file.name, self.context.get("request"))
         return None
 
 
@@ -186,10 +205,10 @@ class CustomerSerializer(serializers.ModelSerializer):
             return obj.user.last_name
         return None
 
-    # Get the user's file if it exists.
+    # Get the URL of the user's file if it exists.
     def get_file(self, obj):
         if obj.file:
-            return obj.file
+            return get_file_url(obj.file.file.name, self.context.get("request"))
         return None
 
     # Get the uploaded_at date for the file if it exists.
@@ -197,3 +216,48 @@ class CustomerSerializer(serializers.ModelSerializer):
         if obj.file:
             return obj.file.uploaded_at
         return None
+
+
+# Reads the related user and file columns shared by the profile list projections.
+class ProfileValuesMixin:
+    values = ["user__username", "user__first_name", "user__last_name", "file__file"]
+
+    def get_username(self, row):
+        return row["user__username"]
+
+    def get_first_name(self, row):
+        return row["user__first_name"]
+
+    def get_last_name(self, row):
+        return row["user__last_name"]
+
+    def get_file(self, row):
+        return get_file_url(row["file__file"], self.context.get("request"))
+
+
+# Fast list serialization with the same output as ProfileSerializer.
+class ProfileValuesSerializer(ProfileValuesMixin, ValuesSerializer):
+    serializer_class = ProfileSerializer
+    values = ProfileValuesMixin.values + ["user__email", "file__file_hash"]
+
+    def get_file_variants(self, row):
+        if row["file__file"] is not None:
+            return get_variant_urls(row["file__file_hash"], self.context.get("request"))
+        return None
+
+    def get_email(self, row):
+        return row["user__email"]
+
+
+# Fast list serialization with the same output as BusinessSerializer.
+class BusinessValuesSerializer(ProfileValuesMixin, ValuesSerializer):
+    serializer_class = BusinessSerializer
+
+
+# Fast list serialization with the same output as CustomerSerializer.
+class CustomerValuesSerializer(ProfileValuesMixin, ValuesSerializer):
+    serializer_class = CustomerSerializer
+    values = ProfileValuesMixin.values + ["file__uploaded_at"]
+
+    def get_uploaded_at(self, row):
+        return row["file__uploaded_at"]
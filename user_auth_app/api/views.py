@@ -12,7 +12,7 @@ from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
 
 from user_auth_app.api.permissions import ProfileOwnerPermissions
-from user_auth_app.api.serializers import BusinessSerializer, CustomerSerializer, LoginSerializer, ProfilResponseSerializer, ProfilRegistrationSerializer, ProfileSerializer
+from user_auth_app.api.serializers import BusinessSerializer, BusinessValuesSerializer, CustomerSerializer, CustomerValuesSerializer, LoginSerializer, ProfilResponseSerializer, ProfilRegistrationSerializer, ProfileSerializer, ProfileValuesSerializer
 from user_auth_app.models import Profile
 
 
@@ -157,6 +157,12 @@ class ProfileViewSet(ModelViewSet):
         except (ObjectDoesNotExist, Http404):
             raise NotFound("Profile was not found!")
 
+    # Lists all profiles through the values() projection of ProfileSerializer.
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        serializer = ProfileValuesSerializer(context=self.get_serializer_context())
+        return Response(serializer.serialize(queryset), status=status.HTTP_200_OK)
+
     @extend_schema(
         summary="Retrieve a profile",
         description="Returns the profile for a given user ID.",
@@ -228,9 +234,9 @@ class BusinessListView(generics.ListAPIView):
     )
     def get(self, request, *args, **kwargs):
         try:
-            data = Profile.objects.filter(type="business")
-            serializer = self.get_serializer(data, many=True)
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            queryset = Profile.objects.filter(type="business")
+            serializer = BusinessValuesSerializer(context=self.get_serializer_context())
+            return Response(serializer.serialize(queryset), status=status.HTTP_200_OK)
         except Exception:
             return Response({"details": "Internal Server error occured!"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -252,8 +258,8 @@ class CustomerListView(generics.ListAPIView):
     )
     def get(self, request, *args, **kwargs):
         try:
-            data = Profile.objects.filter(type="customer")
-            serializer = self.get_serializer(data, many=True)
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            queryset = Profile.objects.filter(type="customer")
+            serializer = CustomerValuesSerializer(context=self.get_serializer_context())
+            return Response(serializer.serialize(queryset), status=status.HTTP_200_OK)
         except Exception as e:
             return Response({"details": "Internal Server error!"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
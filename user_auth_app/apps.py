@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class UserAuthAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'user_auth_app'
+
+    # Connects the model signals.
+    def ready(self):
+        from user_auth_app import signals  # noqa: F401
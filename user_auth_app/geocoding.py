@@ -0,0 +1,59 @@
+import csv
+from functools import lru_cache
+from math import cos, floor, radians
+from pathlib import Path
+import re
+
+
+GAZETTEER_PATH = Path(__file__).resolve().parent / "data" / "gazetteer.csv"
+
+# Edge length of a spatial index cell in degrees (about 55 km of latitude).
+GRID_CELL_SIZE = 0.5
+
+EARTH_RADIUS_KM = 6371.0
+
+KM_PER_DEGREE = 111.32
+
+
+# Normalizes a place name for gazetteer lookups.
+def normalize_place(name):
+    return re.sub(r"\s+", " ", name).strip().casefold()
+
+
+# Loads the bundled gazetteer into a mapping of normalized place names to coordinates.
+@lru_cache(maxsize=1)
+def load_gazetteer():
+    with open(GAZETTEER_PATH, encoding="utf-8", newline="") as file:
+        return {
+            normalize_place(row["name"]): (float(row["latitude"]), float(row["longitude"]))
+            for row in csv.DictReader(file)
+        }
+
+
+# Resolves a free-text location to coordinates offline, or None if no known place is found.
+# Tries the whole text, then each comma separated part, then each word.
+def geocode(location):
+    if not location:
+        return None
+    gazetteer = load_gazetteer()
+    candidates = [location, *location.split(",")]
+    candidates += re.split(r"[\s,/()\-]+", location)
+    for candidate in candidates:
+        coordinates = gazetteer.get(normalize_place(candidate))
+        if coordinates is not None:
+            return coordinates
+    return None
+
+
+# Returns the spatial index cell containing the given coordinates.
+def get_grid_cell(latitude, longitude):
+    return floor(latitude / GRID_CELL_SIZE), floor(longitude / GRID_CELL_SIZE)
+
+
+# Returns the inclusive cell ranges of the bounding box around a circle.
+def get_grid_range(latitude, longitude, radius_km):
+    lat_delta = radius_km / KM_PER_DEGREE
+    lng_delta = radius_km / (KM_PER_DEGREE * max(cos(radians(latitude)), 0.01))
+    min_lat, min_lng = get_grid_cell(max(latitude - lat_delta, -90), max(longitude - lng_delta, -180))
+    max_lat, max_lng = get_grid_cell(min(latitude + lat_delta, 90), min(longitude + lng_delta, 180))
+    return (min_lat, max_lat), (min_lng, max_lng)
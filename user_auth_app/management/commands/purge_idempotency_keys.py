@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from core.idempotency import purge_expired_keys
+
+
+# Management command deleting expired idempotency keys, e.g. hourly, to keep the table bounded.
+class Command(BaseCommand):
+    help = "Deletes the stored Idempotency-Key responses older than IDEMPOTENCY_KEY_TTL."
+
+    def handle(self, *args, **options):
+        purged = purge_expired_keys()
+        self.stdout.write(self.style.SUCCESS(f"Purged {purged} expired idempotency keys."))
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-17 06:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user_auth_app', '0014_alter_profile_description_alter_profile_location'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profilefile',
+            name='file_hash',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.1 on 2026-10-17 07:12
+
+from django.conf import settings
+from django.db import migrations, models
+
+from user_auth_app.geocoding import geocode, get_grid_cell
+
+
+# Geocodes the locations of existing business profiles.
+def geocode_profiles(apps, schema_editor):
+    Profile = apps.get_model("user_auth_app", "Profile")
+    profiles = []
+    for profile in Profile.objects.filter(type="business").exclude(location=""):
+        coordinates = geocode(profile.location)
+        if coordinates is not None:
+            profile.latitude, profile.longitude = coordinates
+            profile.grid_lat, profile.grid_lng = get_grid_cell(*coordinates)
+            profiles.append(profile)
+    Profile.objects.bulk_update(profiles, ["latitude", "longitude", "grid_lat", "grid_lng"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user_auth_app', '0015_profilefile_file_hash'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='grid_lat',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='grid_lng',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='latitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='longitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='profile',
+            index=models.Index(fields=['grid_lat', 'grid_lng'], name='profile_grid_idx'),
+        ),
+        migrations.RunPython(geocode_profiles, migrations.RunPython.noop),
+    ]
@@ -1,7 +1,11 @@
 from django.contrib.auth.models import User
 from django.db import models
+from django.db.models import ExpressionWrapper, Value
+from django.db.models.functions import ASin, Cos, Power, Radians, Sin, Sqrt
 from django.utils import timezone
 
+from user_auth_app.geocoding import EARTH_RADIUS_KM, get_grid_range
+
 
 # Choices for profile type: either business or customer.
 TYPE_CHOICES = (
@@ -13,6 +17,7 @@ TYPE_CHOICES = (
 # Model representing a file related to a profile (e.g. profile image).
 class ProfileFile(models.Model):
     file = models.FileField(upload_to="profile-img/", max_length=255, blank=True)
+    file_hash = models.CharField(max_length=64, blank=True, default="")
     uploaded_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -24,6 +29,26 @@ class ProfileFile(models.Model):
         return self.file
 
 
+# QuerySet for profiles with spatial lookups on the geocoded location.
+class ProfileQuerySet(models.QuerySet):
+
+    # Profiles within radius_km of a point: the grid index narrows the candidates,
+    # then the haversine distance is checked exactly.
+    def near(self, latitude, longitude, radius_km):
+        (min_lat, max_lat), (min_lng, max_lng) = get_grid_range(latitude, longitude, radius_km)
+        lat, lng = Radians(Value(latitude)), Radians(Value(longitude))
+        a = (
+            Power(Sin((Radians("latitude") - lat) / 2), 2)
+            + Cos(lat) * Cos(Radians("latitude")) * Power(Sin((Radians("longitude") - lng) / 2), 2)
+        )
+        return self.filter(
+            grid_lat__range=(min_lat, max_lat),
+            grid_lng__range=(min_lng, max_lng),
+        ).annotate(
+            distance=ExpressionWrapper(2 * EARTH_RADIUS_KM * ASin(Sqrt(a)), output_field=models.FloatField()),
+        ).filter(distance__lte=radius_km)
+
+
 # Model representing a user profile, linked to a user and optionally to a file.
 class Profile(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="profiles")
@@ -34,12 +59,45 @@ class Profile(models.Model):
     working_hours = models.CharField(max_length=255, blank=True, default="")
     type = models.CharField(max_length=255, choices=TYPE_CHOICES)
     file = models.ForeignKey(ProfileFile, on_delete=models.CASCADE, null=True, blank=True, related_name="profiles")
-    
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+    grid_lat = models.IntegerField(null=True, blank=True)
+    grid_lng = models.IntegerField(null=True, blank=True)
+
+    objects = ProfileQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Profile"
         verbose_name_plural = "Profiles"
         ordering = ["user"]
+        indexes = [
+            models.Index(fields=["grid_lat", "grid_lng"], name="profile_grid_idx"),
+        ]
     
     def __str__(self):
         return self.user.username
     
+
+
+# Response stored for a request sent with an Idempotency-Key header, shared by all workers.
+# A row without status_code marks a request that is still being processed.
+class IdempotencyKey(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="idempotency_keys")
+    key = models.CharField(max_length=255)
+    fingerprint = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    content = models.BinaryField(blank=True, default=b"")
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = "Idempotency Key"
+        verbose_name_plural = "Idempotency Keys"
+        constraints = [
+            models.UniqueConstraint(fields=["user", "key"], name="idempotency_user_key_unique"),
+        ]
+        indexes = [
+            models.Index(fields=["created_at"], name="idempotency_created_idx"),
+        ]
+
+    def __str__(self):
+        return self.key
@@ -0,0 +1,54 @@
+from django.db.models.signals import post_init, post_save, pre_save
+from django.dispatch import receiver
+
+from core.images import remember_stored_file, remember_upload_digest, schedule_image_processing
+from user_auth_app.geocoding import geocode, get_grid_cell
+from user_auth_app.models import Profile, ProfileFile
+
+
+# Keeps the hash of a streamed profile file upload for the pipeline.
+@receiver(pre_save, sender=ProfileFile)
+def remember_profile_file_digest(sender, instance, **kwargs):
+    remember_upload_digest(instance, "file")
+
+
+# Records the stored profile file name to detect replaced files.
+@receiver(post_init, sender=ProfileFile)
+def remember_profile_file(sender, instance, **kwargs):
+    remember_stored_file(instance, "file")
+
+
+# Generates the image variants of a new or replaced profile file in the background.
+@receiver(post_save, sender=ProfileFile)
+def process_profile_file(sender, instance, created, **kwargs):
+    schedule_image_processing(instance, "file", "file_hash", created)
+
+
+# Profile fields whose change requires geocoding the profile again.
+GEOCODE_SOURCE_FIELDS = {"location", "type"}
+
+# Profile fields computed from the location.
+GEOCODE_FIELDS = ["latitude", "longitude", "grid_lat", "grid_lng"]
+
+
+# Geocodes the location of business profiles into coordinates and a spatial index cell.
+@receiver(pre_save, sender=Profile)
+def geocode_profile(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not GEOCODE_SOURCE_FIELDS.intersection(update_fields):
+        return
+    coordinates = geocode(instance.location) if instance.type == "business" else None
+    if coordinates is None:
+        instance.latitude = instance.longitude = instance.grid_lat = instance.grid_lng = None
+        return
+    instance.latitude, instance.longitude = coordinates
+    instance.grid_lat, instance.grid_lng = get_grid_cell(*coordinates)
+
+
+# Stores the computed coordinates when a save limited by update_fields left them out.
+@receiver(post_save, sender=Profile)
+def store_profile_coordinates(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or not GEOCODE_SOURCE_FIELDS.intersection(update_fields):
+        return
+    if set(GEOCODE_FIELDS).issubset(update_fields):
+        return
+    Profile.objects.filter(pk=instance.pk).update(**{field: getattr(instance, field) for field in GEOCODE_FIELDS})